@@ -4,19 +4,25 @@ FX endpoints (currency conversion)
 Uses Frankfurter (no API key): https://www.frankfurter.app/
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Dict, Any
-import time
-import requests
+import asyncio
+import httpx
+from cachetools import TTLCache
+
+from services.utils import coalesce
 
 router = APIRouter()
 
-_CACHE: Dict[str, Dict[str, Any]] = {}
 _TTL_SECONDS = 60 * 60  # 1 hour
+# Bounded LRU+TTL cache; entries expire instead of accumulating forever
+_CACHE: "TTLCache[str, Dict[str, Any]]" = TTLCache(maxsize=2048, ttl=_TTL_SECONDS)
+_INFLIGHT: Dict[str, "asyncio.Task"] = {}
 
 
 @router.get("/fx/rate")
 async def get_fx_rate(
+    request: Request,
     base: str = Query("USD", min_length=3, max_length=3),
     quote: str = Query("USD", min_length=3, max_length=3),
 ):
@@ -27,13 +33,18 @@ async def get_fx_rate(
 
     key = f"{base}_{quote}"
     cached = _CACHE.get(key)
-    if cached and (time.time() - cached["ts"] < _TTL_SECONDS):
-        return cached["data"]
+    if cached is not None:
+        return cached
+
+    # Concurrent misses for the same pair share one upstream call
+    return await coalesce(_INFLIGHT, key, lambda: _fetch_rate(request.app.state.http, base, quote, key))
+
 
+async def _fetch_rate(http: httpx.AsyncClient, base: str, quote: str, key: str) -> Dict[str, Any]:
     try:
         # Use the API host (the www host may serve a static site)
         url = "https://api.frankfurter.app/latest"
-        resp = requests.get(url, params={"from": base, "to": quote}, timeout=15)
+        resp = await http.get(url, params={"from": base, "to": quote}, timeout=15)
         if resp.status_code != 200:
             raise HTTPException(status_code=502, detail=f"FX provider error: {resp.status_code} {resp.text}")
         payload = resp.json()
@@ -42,7 +53,7 @@ async def get_fx_rate(
         if rate is None:
             raise HTTPException(status_code=502, detail="FX provider returned no rate")
         data = {"base": base, "quote": quote, "rate": float(rate), "source": "frankfurter", "date": payload.get("date")}
-        _CACHE[key] = {"ts": time.time(), "data": data}
+        _CACHE[key] = data
         return data
     except HTTPException:
         raise
@@ -8,45 +8,112 @@ Setup:
   export FINNHUB_API_KEY="your_token"
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+import asyncio
 import os
+import re
 import time
-import requests
+import zlib
+import httpx
+import numpy as np
+import orjson
+from cachetools import TTLCache
 from datetime import datetime, timedelta, timezone
 
-router = APIRouter()
+from services.utils import coalesce
+
+try:
+    # Optional C-backed multi-pattern matcher for lexicon scoring
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
-# Flag to track if FinBERT is available
-_finbert_available = None
+try:
+    # Imported once here rather than on every FinBERT request
+    from services.finbert_service import analyze_texts_batch
+except ImportError as e:
+    print(f"FinBERT service unavailable: {e}")
+    analyze_texts_batch = None
+
+router = APIRouter()
 
-# Simple in-memory cache to avoid hammering the API during development
-_CACHE: Dict[str, Dict[str, Any]] = {}
+# Bounded in-memory LRU+TTL cache to avoid hammering the API.
+# Per-process only: with several workers each keeps its own copy.
+# Entries are zlib-compressed JSON bodies, not Python dicts.
 _CACHE_TTL_SECONDS = 60
+_CACHE: "TTLCache[str, bytes]" = TTLCache(maxsize=1024, ttl=_CACHE_TTL_SECONDS)
+_SUMMARY_MAX_CHARS = 200
+
+# Upstream fetches currently running, keyed like _CACHE, so concurrent misses share one call
+_INFLIGHT: Dict[str, "asyncio.Task"] = {}
+
+# Upstream gateway errors worth retrying before giving up
+_RETRY_STATUSES = {502, 503, 504}
+
+# Cap concurrent Finnhub requests so bursts queue here instead of tripping 429s
+_FINNHUB_SEMAPHORE = asyncio.Semaphore(5)
+_MAX_RETRY_AFTER_SECONDS = 5.0
 
 
-POS_WORDS = {
+POS_WORDS = frozenset({
     "beat", "beats", "strong", "surge", "growth", "record", "profit", "profits", "up",
     "upgrade", "bullish", "outperform", "raise", "raises", "raised", "positive", "wins",
     "breakthrough", "rally", "rebound", "accelerate",
-}
-NEG_WORDS = {
+})
+NEG_WORDS = frozenset({
     "miss", "misses", "weak", "drop", "drops", "fall", "falls", "down", "lawsuit", "probe",
-    "downgrade", "bearish", "cut", "cuts", "cuts", "negative", "slump", "risk", "risks",
+    "downgrade", "bearish", "cut", "cuts", "negative", "slump", "risk", "risks",
     "warning", "layoff", "layoffs", "decline", "halt",
-}
+})
+
+# Lexicon scores outside [LOW, HIGH] are decisive enough to skip FinBERT
+_LEXICON_DECISIVE_LOW = 0.3
+_LEXICON_DECISIVE_HIGH = 0.7
+
+# Word -> +1/-1, so each token needs a single lookup
+_POLARITY: Dict[str, int] = {w: 1 for w in POS_WORDS}
+_POLARITY.update({w: -1 for w in NEG_WORDS})
+_TOKEN_RE = re.compile(r"[a-z]+")
+_ASCII_LOWER = frozenset("abcdefghijklmnopqrstuvwxyz")
+
+
+def _build_automaton():
+    """Compile the lexicon into a single Aho-Corasick automaton, if pyahocorasick is installed."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, polarity in _POLARITY.items():
+        automaton.add_word(word, (polarity, len(word)))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
 
 
-def _sentiment_score(text: str) -> float:
+def _polarity_hits(text: str) -> Iterator[Tuple[int, int]]:
     """
-    Lightweight lexicon sentiment score mapped to [0..1].
+    Yield (offset, polarity) for every lexicon word in already-lowercased text.
+    Uses the C automaton when available, otherwise the regex tokenizer; both
+    only count whole [a-z]+ tokens.
     """
-    t = (text or "").lower()
-    tokens = [w.strip(".,:;!?()[]{}'\"") for w in t.split()]
-    pos = sum(1 for w in tokens if w in POS_WORDS)
-    neg = sum(1 for w in tokens if w in NEG_WORDS)
-    raw = (pos - neg) / max(1, pos + neg)  # [-1..1]
-    return (raw + 1) / 2  # [0..1]
+    if _AUTOMATON is None:
+        for m in _TOKEN_RE.finditer(text):
+            p = _POLARITY.get(m.group())
+            if p:
+                yield m.start(), p
+        return
+
+    last = len(text) - 1
+    for end, (polarity, length) in _AUTOMATON.iter(text):
+        start = end - length + 1
+        # Reject matches inside a longer word (e.g. "up" in "upgrade")
+        if start > 0 and text[start - 1] in _ASCII_LOWER:
+            continue
+        if end < last and text[end + 1] in _ASCII_LOWER:
+            continue
+        yield start, polarity
 
 
 def _sentiment_label(score01: float) -> str:
@@ -57,10 +124,81 @@ def _sentiment_label(score01: float) -> str:
     return "Neutral"
 
 
-def _relative_time(dt: datetime) -> str:
-    now = datetime.now(timezone.utc)
-    delta = now - dt
-    seconds = int(delta.total_seconds())
+def _sentiment_scores(texts: List[str]) -> np.ndarray:
+    """
+    Lightweight lexicon sentiment scores mapped to [0..1], one per text: one scan
+    of the joined batch, with hits attributed back to their article by offset.
+    """
+    lowered = [(t or "").lower() for t in texts]
+    # Offset where each text starts in the joined string (+1 for the separator)
+    starts = np.zeros(len(lowered), dtype=np.int64)
+    if len(lowered) > 1:
+        np.cumsum([len(t) + 1 for t in lowered[:-1]], out=starts[1:])
+
+    pos = np.zeros(len(lowered))
+    neg = np.zeros(len(lowered))
+    hits = np.array(list(_polarity_hits("\x00".join(lowered))), dtype=np.int64).reshape(-1, 2)
+    if len(hits):
+        owner = np.searchsorted(starts, hits[:, 0], side="right") - 1
+        pos = np.bincount(owner, weights=hits[:, 1] > 0, minlength=len(lowered))
+        neg = np.bincount(owner, weights=hits[:, 1] < 0, minlength=len(lowered))
+
+    raw = (pos - neg) / np.maximum(1, pos + neg)  # [-1..1]
+    return (raw + 1) / 2  # [0..1]
+
+
+def _sentiment_labels(scores01: np.ndarray) -> np.ndarray:
+    """Vectorized _sentiment_label."""
+    return np.select([scores01 >= 0.56, scores01 <= 0.44], ["Positive", "Negative"], "Neutral")
+
+
+def _unique_by_url(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop news items whose url was already seen, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for it in items:
+        url = it.get("url")
+        if url:
+            if url in seen:
+                continue
+            seen.add(url)
+        unique.append(it)
+    return unique
+
+
+def _short_summary(summary: str) -> str:
+    """Cut a summary down to what the UI shows."""
+    if len(summary) > _SUMMARY_MAX_CHARS:
+        return summary[:_SUMMARY_MAX_CHARS].rstrip() + "…"
+    return summary
+
+
+def _cache_response(cache_key: str, data: Dict[str, Any]) -> Response:
+    """Serialize `data` once, store it compressed and return it as the response."""
+    body = orjson.dumps(data)
+    _CACHE[cache_key] = zlib.compress(body)
+    return Response(body, media_type="application/json")
+
+
+def _cached_response(cache_key: str) -> Optional[Response]:
+    blob = _CACHE.get(cache_key)
+    if blob is None:
+        return None
+    return Response(zlib.decompress(blob), media_type="application/json")
+
+
+def _retry_after_seconds(resp: httpx.Response, default: float) -> float:
+    """Seconds to wait from a 429 response's Retry-After header (delta-seconds form)."""
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
+
+
+def _relative_time(dt_ts: int, now_ts: int) -> str:
+    """Human-readable age of a Unix timestamp relative to `now_ts`, computed once per request."""
+    seconds = now_ts - int(dt_ts)
     if seconds < 60:
         return "just now"
     minutes = seconds // 60
@@ -73,8 +211,70 @@ def _relative_time(dt: datetime) -> str:
     return f"{days} days ago" if days != 1 else "1 day ago"
 
 
+async def _fetch_finnhub_news(
+    http: httpx.AsyncClient, token: str, symbol: str, days: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Fetch up to `limit` company-news items from Finnhub for the last `days` days."""
+    to_dt = datetime.now(timezone.utc)
+    from_dt = to_dt - timedelta(days=days)
+
+    url = "https://finnhub.io/api/v1/company-news"
+    params = {
+        "symbol": symbol,
+        "from": from_dt.strftime("%Y-%m-%d"),
+        "to": to_dt.strftime("%Y-%m-%d"),
+        "token": token,
+    }
+
+    # Finnhub can occasionally reset connections or rate-limit.
+    # Retry a few times with small backoff for transient network issues
+    # and gateway errors.
+    last_err: Optional[str] = None
+    resp = None
+    async with _FINNHUB_SEMAPHORE:
+        for attempt in range(1, 4):
+            try:
+                resp = await http.get(url, params=params)
+                if resp.status_code == 429:
+                    # Rate limited: wait out a short Retry-After, otherwise give up
+                    delay = _retry_after_seconds(resp, default=0.4 * attempt)
+                    if attempt < 3 and delay <= _MAX_RETRY_AFTER_SECONDS:
+                        await asyncio.sleep(delay)
+                        continue
+                    raise HTTPException(status_code=502, detail="News provider rate limit reached. Please try again in a minute.")
+                if resp.status_code in _RETRY_STATUSES and attempt < 3:
+                    await asyncio.sleep(0.4 * attempt)
+                    continue
+                if resp.status_code != 200:
+                    raise HTTPException(status_code=502, detail=f"News provider error: {resp.status_code} {resp.text}")
+                items = resp.json()
+                if not isinstance(items, list):
+                    raise HTTPException(status_code=502, detail="Unexpected response from news provider")
+                break
+            except HTTPException:
+                raise
+            except httpx.RequestError as e:
+                # Connection reset / timeouts / transient network
+                last_err = str(e)
+                if attempt < 3:
+                    await asyncio.sleep(0.4 * attempt)
+                    continue
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Failed to fetch news (network issue). Please try again. Details: {last_err}",
+                )
+            except Exception as e:
+                last_err = str(e)
+                raise HTTPException(status_code=502, detail=f"Failed to fetch news: {last_err}")
+
+    # Dedupe before cutting to `limit`, so repeated urls don't shrink the page, and before
+    # scoring, so scores and totals only ever count the articles actually returned
+    return _unique_by_url(items)[:limit]
+
+
 @router.get("/news/{symbol}")
 async def get_latest_news(
+    request: Request,
     symbol: str,
     days: int = Query(7, ge=1, le=30, description="Lookback window in days"),
     limit: int = Query(15, ge=1, le=50, description="Maximum number of articles"),
@@ -91,82 +291,44 @@ async def get_latest_news(
 
     symbol = symbol.upper()
     cache_key = f"{symbol}:{days}:{limit}"
-    cached = _CACHE.get(cache_key)
-    if cached and (time.time() - cached["ts"] < _CACHE_TTL_SECONDS):
-        return cached["data"]
-
-    to_dt = datetime.now(timezone.utc)
-    from_dt = to_dt - timedelta(days=days)
-
-    url = "https://finnhub.io/api/v1/company-news"
-    params = {
-        "symbol": symbol,
-        "from": from_dt.strftime("%Y-%m-%d"),
-        "to": to_dt.strftime("%Y-%m-%d"),
-        "token": token,
-    }
-
-    # Finnhub can occasionally reset connections or rate-limit.
-    # Retry a few times with small backoff for transient network issues.
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "FinTrend/1.0 (+FastAPI)",
-    }
-    last_err: Optional[str] = None
-    resp = None
-    for attempt in range(1, 4):
-        try:
-            resp = requests.get(url, params=params, headers=headers, timeout=20)
-            if resp.status_code == 429:
-                # Rate limited
-                raise HTTPException(status_code=502, detail="News provider rate limit reached. Please try again in a minute.")
-            if resp.status_code != 200:
-                raise HTTPException(status_code=502, detail=f"News provider error: {resp.status_code} {resp.text}")
-            items = resp.json()
-            if not isinstance(items, list):
-                raise HTTPException(status_code=502, detail="Unexpected response from news provider")
-            break
-        except HTTPException:
-            raise
-        except requests.exceptions.RequestException as e:
-            # Connection reset / timeouts / transient network
-            last_err = str(e)
-            if attempt < 3:
-                time.sleep(0.4 * attempt)
-                continue
-            raise HTTPException(
-                status_code=502,
-                detail=f"Failed to fetch news (network issue). Please try again. Details: {last_err}",
-            )
-        except Exception as e:
-            last_err = str(e)
-            raise HTTPException(status_code=502, detail=f"Failed to fetch news: {last_err}")
-
-    items = items[:limit]
+    cached = _cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    return await coalesce(
+        _INFLIGHT, cache_key, lambda: _fetch_news(request.app.state.http, token, symbol, days, limit, cache_key)
+    )
+
+
+async def _fetch_news(
+    http: httpx.AsyncClient, token: str, symbol: str, days: int, limit: int, cache_key: str
+) -> Response:
+    """Fetch and lexicon-score news for a cache miss, then populate the cache."""
+    items = await _fetch_finnhub_news(http, token, symbol, days, limit)
+    now_ts = int(time.time())
+    # Score every article in one pass over the whole batch
+    scores = _sentiment_scores(
+        [f"{it.get('headline') or ''} {it.get('summary') or ''}".strip() for it in items]
+    )
+    labels = _sentiment_labels(scores)
     articles = []
-    scores = []
-    for idx, it in enumerate(items):
+    for idx, (it, score, label) in enumerate(zip(items, scores.tolist(), labels.tolist())):
         headline = it.get("headline") or ""
         summary = it.get("summary") or ""
-        combined = f"{headline} {summary}".strip()
-        score = float(_sentiment_score(combined))
-        label = _sentiment_label(score)
-        dt = datetime.fromtimestamp(int(it.get("datetime", 0)), tz=timezone.utc) if it.get("datetime") else to_dt
-        scores.append(score)
         articles.append(
             {
                 "id": it.get("id", idx + 1),
                 "title": headline or "(No title)",
                 "source": it.get("source", "Unknown"),
-                "timestamp": _relative_time(dt),
+                "timestamp": _relative_time(it.get("datetime") or now_ts, now_ts),
                 "sentiment": label,
                 "score": score,  # [0..1]
-                "summary": summary or "",
+                "summary": _short_summary(summary),
                 "url": it.get("url"),
             }
         )
 
-    avg_score = float(sum(scores) / max(1, len(scores))) if scores else 0.5
+    avg_score = float(scores.mean()) if len(scores) else 0.5
     overall = _sentiment_label(avg_score)
 
     data = {
@@ -177,24 +339,12 @@ async def get_latest_news(
         "articles": articles,
     }
 
-    _CACHE[cache_key] = {"ts": time.time(), "data": data}
-    return data
-
-
-def _check_finbert_available():
-    """Check if FinBERT model is available."""
-    global _finbert_available
-    if _finbert_available is None:
-        try:
-            from services.finbert_service import get_model_status
-            _finbert_available = True
-        except ImportError:
-            _finbert_available = False
-    return _finbert_available
+    return _cache_response(cache_key, data)
 
 
 @router.get("/news/{symbol}/finbert")
 async def get_news_with_finbert(
+    request: Request,
     symbol: str,
     days: int = Query(7, ge=1, le=30, description="Lookback window in days"),
     limit: int = Query(15, ge=1, le=50, description="Maximum number of articles"),
@@ -203,19 +353,13 @@ async def get_news_with_finbert(
     Fetch latest news for a stock symbol and compute sentiment using FinBERT.
     This endpoint uses the actual FinBERT transformer model for accurate sentiment analysis.
     """
-    # First check if FinBERT is available
-    if not _check_finbert_available():
+    # First check if FinBERT is available (probed once at startup)
+    if not getattr(request.app.state, "finbert_available", False):
         raise HTTPException(
             status_code=503,
             detail="FinBERT model is not available. Install transformers and torch packages."
         )
     
-    # Import FinBERT service
-    try:
-        from services.finbert_service import analyze_texts_batch
-    except ImportError as e:
-        raise HTTPException(status_code=503, detail=f"FinBERT service error: {e}")
-    
     token = os.getenv("FINNHUB_API_KEY")
     if not token:
         raise HTTPException(
@@ -227,67 +371,34 @@ async def get_news_with_finbert(
     
     # Check cache for FinBERT results
     cache_key = f"finbert:{symbol}:{days}:{limit}"
-    cached = _CACHE.get(cache_key)
-    if cached and (time.time() - cached["ts"] < _CACHE_TTL_SECONDS):
-        return cached["data"]
+    cached = _cached_response(cache_key)
+    if cached is not None:
+        return cached
 
-    to_dt = datetime.now(timezone.utc)
-    from_dt = to_dt - timedelta(days=days)
+    return await coalesce(
+        _INFLIGHT, cache_key, lambda: _fetch_finbert_news(request.app.state.http, token, symbol, days, limit, cache_key)
+    )
 
-    url = "https://finnhub.io/api/v1/company-news"
-    params = {
-        "symbol": symbol,
-        "from": from_dt.strftime("%Y-%m-%d"),
-        "to": to_dt.strftime("%Y-%m-%d"),
-        "token": token,
-    }
 
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "FinTrend/1.0 (+FastAPI)",
-    }
-    
-    last_err: Optional[str] = None
-    resp = None
-    items = []
-    
-    for attempt in range(1, 4):
-        try:
-            resp = requests.get(url, params=params, headers=headers, timeout=20)
-            if resp.status_code == 429:
-                raise HTTPException(status_code=502, detail="News provider rate limit reached. Please try again in a minute.")
-            if resp.status_code != 200:
-                raise HTTPException(status_code=502, detail=f"News provider error: {resp.status_code} {resp.text}")
-            items = resp.json()
-            if not isinstance(items, list):
-                raise HTTPException(status_code=502, detail="Unexpected response from news provider")
-            break
-        except HTTPException:
-            raise
-        except requests.exceptions.RequestException as e:
-            last_err = str(e)
-            if attempt < 3:
-                time.sleep(0.4 * attempt)
-                continue
-            raise HTTPException(
-                status_code=502,
-                detail=f"Failed to fetch news (network issue). Please try again. Details: {last_err}",
-            )
-        except Exception as e:
-            last_err = str(e)
-            raise HTTPException(status_code=502, detail=f"Failed to fetch news: {last_err}")
+async def _fetch_finbert_news(
+    http: httpx.AsyncClient, token: str, symbol: str, days: int, limit: int, cache_key: str
+) -> Response:
+    """Fetch and FinBERT-score news for a cache miss, then populate the cache."""
+    if analyze_texts_batch is None:
+        raise HTTPException(status_code=503, detail="FinBERT service error: services.finbert_service could not be imported")
 
-    items = items[:limit]
+    items = await _fetch_finnhub_news(http, token, symbol, days, limit)
+    now_ts = int(time.time())
     
     if not items:
-        return {
+        return _cache_response(cache_key, {
             "stock": symbol,
             "totalArticles": 0,
             "overallSentiment": "Neutral",
             "sentimentScore": 0.5,
             "articles": [],
             "model": "FinBERT"
-        }
+        })
     
     # Extract texts for FinBERT analysis
     texts = []
@@ -297,11 +408,31 @@ async def get_news_with_finbert(
         combined = f"{headline}. {summary}".strip()
         texts.append(combined if combined else "No content")
     
-    # Analyze with FinBERT
-    try:
-        finbert_results = analyze_texts_batch(texts, batch_size=8)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"FinBERT analysis failed: {e}")
+    # Articles the lexicon already scores decisively keep that result;
+    # only the ambiguous middle goes through FinBERT
+    lex_scores = _sentiment_scores(texts).tolist()
+    finbert_results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+    ambiguous_idx = []
+    for i, s in enumerate(lex_scores):
+        if _LEXICON_DECISIVE_LOW <= s <= _LEXICON_DECISIVE_HIGH:
+            ambiguous_idx.append(i)
+        else:
+            finbert_results[i] = {
+                "label": "positive" if s > _LEXICON_DECISIVE_HIGH else "negative",
+                "score": 2 * s - 1,
+                "probabilities": [1 - s, 0.0, s],
+                "source": "lexicon",
+            }
+
+    # Analyze with FinBERT. finbert_service owns length bucketing, inference
+    # mode and precision for the forward pass.
+    if ambiguous_idx:
+        try:
+            fb_results = analyze_texts_batch([texts[i] for i in ambiguous_idx], batch_size=16)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"FinBERT analysis failed: {e}")
+        for i, fb_result in zip(ambiguous_idx, fb_results):
+            finbert_results[i] = {**fb_result, "source": "finbert"}
     
     articles = []
     scores = []
@@ -315,18 +446,17 @@ async def get_news_with_finbert(
         # Convert score from [-1, 1] to [0, 1]
         score01 = (fb_result["score"] + 1) / 2
         
-        dt = datetime.fromtimestamp(int(it.get("datetime", 0)), tz=timezone.utc) if it.get("datetime") else to_dt
-        
         scores.append(score01)
         articles.append({
             "id": it.get("id", idx + 1),
             "title": headline or "(No title)",
             "source": it.get("source", "Unknown"),
-            "timestamp": _relative_time(dt),
+            "timestamp": _relative_time(it.get("datetime") or now_ts, now_ts),
             "sentiment": label,
             "score": score01,
             "probabilities": fb_result["probabilities"],  # [neg, neu, pos]
-            "summary": summary or "",
+            "sentimentSource": fb_result["source"],  # "lexicon" | "finbert"
+            "summary": _short_summary(summary),
             "url": it.get("url"),
         })
 
@@ -349,8 +479,7 @@ async def get_news_with_finbert(
         "model": "FinBERT"
     }
 
-    _CACHE[cache_key] = {"ts": time.time(), "data": data}
-    return data
+    return _cache_response(cache_key, data)
 
 
 @router.get("/news/finbert/status")
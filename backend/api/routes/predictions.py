@@ -2,21 +2,21 @@
 Prediction endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 import numpy as np
-import sys
-import os
-
-# Add parent directories to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from services.model_service import ModelService
 from services.torch_model_service import TimesNetService, TransformerService
 from services.data_service import DataService
 
 router = APIRouter()
 
+_DATA = DataService.get_instance()
+_MODELS = ModelService.get_instance()
+
 class PredictionRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     symbol: str
     model_type: Optional[str] = "LSTM"  # LSTM, GRU, CNN, RNN, TIMESNET, TRANSFORMER
     sentiment_type: Optional[str] = "nonsentiment"
@@ -24,6 +24,8 @@ class PredictionRequest(BaseModel):
     prediction_length: Optional[int] = 3
 
 class PredictionResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     symbol: str
     predictions: List[float]
     current_price: Optional[float] = None
@@ -98,11 +100,8 @@ async def predict_stock(request: PredictionRequest):
                 raise HTTPException(status_code=500, detail=f"Error making prediction: {str(e)}")
 
         # Keras/TensorFlow models
-        model_service = ModelService.get_instance()
-        data_service = DataService.get_instance()
-        
         # Prepare data - use the model type to get correct config
-        data_result = data_service.prepare_prediction_data(
+        data_result = _DATA.prepare_prediction_data(
             request.symbol,
             request.sentiment_type,
             use_recent=True,
@@ -118,7 +117,7 @@ async def predict_stock(request: PredictionRequest):
         x_test, y_test, y_base = data_result
         
         # Make predictions
-        predictions = model_service.predict(
+        predictions = _MODELS.predict(
             x_test,
             model_type=request.model_type,
             sentiment_type=request.sentiment_type,
@@ -126,11 +125,8 @@ async def predict_stock(request: PredictionRequest):
             prediction_length=request.prediction_length
         )
         
-        # Flatten predictions
-        predictions_flat = []
-        if predictions:
-            for pred_seq in predictions:
-                predictions_flat.extend(pred_seq)
+        # Flatten predictions and keep the requested horizon
+        arr = np.asarray(predictions, dtype=float).reshape(-1)[:request.prediction_length]
         
         # Get current price from the base data
         current_price = None
@@ -139,13 +135,13 @@ async def predict_stock(request: PredictionRequest):
         
         # Denormalize predictions (convert back to original scale)
         # Predictions are normalized: (price/base - 1), so reverse: (pred + 1) * base
-        if current_price and predictions_flat:
-            denormalized_predictions = [(pred + 1) * current_price for pred in predictions_flat[:request.prediction_length]]
+        if current_price:
+            denormalized_predictions = ((arr + 1.0) * current_price).tolist()
         else:
-            denormalized_predictions = predictions_flat[:request.prediction_length]
+            denormalized_predictions = arr.tolist()
         
         # Get model config
-        config = model_service.get_config(request.model_type, request.sentiment_type)
+        config = _MODELS.get_config(request.model_type, request.sentiment_type)
         
         return PredictionResponse(
             symbol=request.symbol.upper(),
@@ -172,15 +168,13 @@ async def predict_stock(request: PredictionRequest):
 @router.get("/predictions/models")
 async def get_available_models():
     """Get list of all available models"""
-    model_service = ModelService.get_instance()
-    
     # Get all available models from the service
-    available_models_dict = model_service.list_available_models()
+    available_models_dict = _MODELS.list_available_models()
     
     models = []
     for model_type, model_list in available_models_dict.items():
         for model_info in model_list:
-            config = model_service.get_config(model_type, model_info['sentiment_type'])
+            config = _MODELS.get_config(model_type, model_info['sentiment_type'])
             
             models.append({
                 "model_type": model_type,
@@ -2,22 +2,19 @@
 Stock data endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
-import sys
-import os
-
-# Add parent directories to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from services.data_service import DataService
 
 router = APIRouter()
 
+_DATA = DataService.get_instance()
+
 @router.get("/stocks")
 async def get_available_stocks():
     """Get list of available stock symbols"""
     try:
-        data_service = DataService.get_instance()
-        stocks = data_service.get_available_stocks()
+        stocks = _DATA.get_available_stocks()
         return {
             "stocks": stocks,
             "count": len(stocks)
@@ -44,8 +41,7 @@ async def get_stock_data(
         Historical stock data
     """
     try:
-        data_service = DataService.get_instance()
-        data = data_service.get_historical_data(symbol, limit)
+        data = _DATA.get_historical_data(symbol, limit)
         
         if data is None:
             raise HTTPException(
@@ -66,33 +62,18 @@ async def get_stock_data(
 async def get_latest_stock_data(symbol: str):
     """Get the latest stock data point for a symbol"""
     try:
-        data_service = DataService.get_instance()
-        df = data_service.load_stock_data(symbol)
-        
-        if df is None or len(df) == 0:
+        latest_row = _DATA.load_latest_row(symbol)
+
+        if latest_row is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Stock data not found for symbol: {symbol}"
             )
-        
-        # Get the latest row (last row in DataFrame)
-        latest_row = df.iloc[-1].to_dict()
-        
-        # Convert to JSON-serializable format
-        import pandas as pd
-        import numpy as np
-        for key, value in latest_row.items():
-            if pd.isna(value):
-                latest_row[key] = None
-            elif isinstance(value, (np.integer, np.floating)):
-                latest_row[key] = float(value)
-            elif pd.api.types.is_datetime64_any_dtype(type(value)):
-                latest_row[key] = str(value)
-        
-        return {
+
+        return ORJSONResponse({
             "symbol": symbol.upper(),
             "latest": latest_row
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
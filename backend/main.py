@@ -1,11 +1,14 @@
 """
 FastAPI Backend for Stock Prediction with LSTM Models
 """
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List
+import httpx
 import uvicorn
 import os
 import sys
@@ -19,18 +22,83 @@ except Exception:
     # dotenv is optional; backend will still work if FINNHUB_API_KEY is exported in the shell
     pass
 
+# Make the backend package root importable regardless of the working directory;
+# route modules rely on this rather than patching sys.path themselves
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
 # Add the model path to sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'FNSPID_Financial_News_Dataset-main', 'dataset_test'))
 
 from services.model_service import ModelService
 from services.data_service import DataService
+from services.torch_model_service import TimesNetService, TransformerService
 from api.routes import predictions, stocks, health, news, fx
 
+def _warm_finbert() -> bool:
+    """Load FinBERT ahead of the first request; returns whether the service is importable"""
+    try:
+        from services.finbert_service import preload_model
+    except ImportError:
+        return False
+    # A failed load is retried lazily by the first FinBERT request
+    preload_model()
+    return True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services and the shared HTTP client on startup, release them on shutdown"""
+    print("Initializing model and data services...")
+    try:
+        # Initialize services (they will be singleton instances)
+        ModelService.get_instance()
+        DataService.get_instance()
+        print("Services initialized successfully")
+    except Exception as e:
+        print(f"Error initializing services: {e}")
+
+    # Warm the torch services, FinBERT and the default Keras models in worker
+    # threads so they load concurrently
+    results = await asyncio.gather(
+        asyncio.to_thread(TimesNetService.get_instance),
+        asyncio.to_thread(TransformerService.get_instance),
+        asyncio.to_thread(_warm_finbert),
+        asyncio.to_thread(ModelService.get_instance().preload),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error warming services: {result}")
+    app.state.finbert_available = results[2] is True
+
+    # One pooled client for all outbound calls (Finnhub, Frankfurter) so handlers
+    # never block the event loop and reuse keep-alive connections.
+    # The transport transparently retries failed connection attempts.
+    transport = httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+    app.state.http = httpx.AsyncClient(
+        timeout=20,
+        transport=transport,
+        headers={"User-Agent": "FinTrend/1.0", "Accept": "application/json"},
+    )
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Stock Prediction API",
     description="API for stock price predictions using LSTM models with sentiment analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Serialize every response with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware configuration - allow all origins for deployment flexibility
@@ -49,26 +117,18 @@ app.include_router(stocks.router, prefix="/api", tags=["Stocks"])
 app.include_router(news.router, prefix="/api", tags=["News"])
 app.include_router(fx.router, prefix="/api", tags=["FX"])
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    print("Initializing model and data services...")
-    try:
-        # Initialize services (they will be singleton instances)
-        ModelService.get_instance()
-        DataService.get_instance()
-        print("Services initialized successfully")
-    except Exception as e:
-        print(f"Error initializing services: {e}")
-
-
 
 if __name__ == "__main__":
+    # DEV=1 gives a single auto-reloading worker; otherwise run one worker per
+    # CPU (override with WEB_CONCURRENCY). uvicorn[standard] installs uvloop and
+    # httptools, which the default "auto" loop/http settings pick up.
+    dev = bool(os.getenv("DEV"))
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=5001,
-        reload=True,
+        reload=dev,
+        workers=1 if dev else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
         log_level="info"
     )
 
@@ -2,16 +2,19 @@
 Data Service for loading and preprocessing stock data
 """
 import os
+import csv
+import importlib.util
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-from typing import Optional, Tuple
-import sys
+from typing import Dict, List, Optional, Tuple
 
 # Get the base directory (project root)
 from .utils import get_base_dir
 BASE_DIR = get_base_dir()
 
-# Add model core paths for DataLoader import (all models use similar data_processor)
+# Model core paths holding DataLoader (all models use similar data_processor)
 MODEL_CORE_PATHS = [
     os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'LSTM-for-Time-Series-Prediction', 'core'),
     os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'GRU-for-Time-Series-Prediction', 'core'),
@@ -19,33 +22,188 @@ MODEL_CORE_PATHS = [
     os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'RNN-for-Time-Series-Prediction', 'core'),
 ]
 
-for core_path in MODEL_CORE_PATHS:
-    if os.path.exists(core_path) and core_path not in sys.path:
-        sys.path.insert(0, core_path)
+def _load_data_loader():
+    """Import DataLoader straight from the first core path that has data_processor.py"""
+    for core_path in MODEL_CORE_PATHS:
+        module_path = os.path.join(core_path, 'data_processor.py')
+        if not os.path.exists(module_path):
+            continue
+        try:
+            spec = importlib.util.spec_from_file_location('data_processor', module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            print(f"Successfully imported DataLoader from {core_path}")
+            return module.DataLoader
+        except (ImportError, AttributeError, SyntaxError) as e:
+            print(f"Could not import DataLoader from {core_path}: {e}")
+    return None
 
-DataLoader = None
-for core_path in MODEL_CORE_PATHS:
-    try:
-        from data_processor import DataLoader
-        print(f"Successfully imported DataLoader from {core_path}")
-        break
-    except ImportError:
-        continue
+
+DataLoader = _load_data_loader()
 
 if DataLoader is None:
     print("Warning: Could not import DataLoader from any model core path")
 
+# CSV header per data file, so tail reads don't have to re-read it
+_SCHEMAS: Dict[str, List[str]] = {}
+# Initial number of bytes read from the end of a file to find its last row
+_TAIL_BYTES = 2048
+
+# Known column types for the stock CSVs, so the parser doesn't have to infer them
+_CSV_DTYPES = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Adj close': 'float64',
+    'Volume': 'int64',
+    'Sentiment_gpt': 'float64',
+    'News_flag': 'float64',
+    'Scaled_sentiment': 'float64',
+}
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+_CSV_ENGINE = 'pyarrow' if _HAS_PYARROW else 'c'
+
+# Parsed copies of the CSVs are kept next to them as <file>.csv.parquet
+_SIDECAR_SUFFIX = '.parquet'
+
+# Number of prepared (x_test, y_test, y_base) results kept in memory
+_PREP_CACHE_SIZE = 64
+
+# Config 'data' keys prepare_prediction_data needs
+_REQUIRED_DATA_KEYS = frozenset({
+    'train_test_split', 'columns', 'columns_to_normalise',
+    'prediction_length', 'sequence_length', 'normalise',
+})
+
+# Build prediction windows with NumPy instead of the FNSPID DataLoader
+# (set FINTREND_FAST_WINDOWS=0 to go back to DataLoader)
+_FAST_WINDOWS = os.getenv("FINTREND_FAST_WINDOWS", "1") != "0"
+
+
+def _read_header(filepath: str) -> List[str]:
+    """Column names of a CSV file, cached in _SCHEMAS"""
+    header = _SCHEMAS.get(filepath)
+    if header is None:
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            header = next(csv.reader(f), [])
+        _SCHEMAS[filepath] = header
+    return header
+
+
+def _read_csv(filepath: str) -> pd.DataFrame:
+    """Parse a stock CSV, with the Date column as datetimes"""
+    header = _read_header(filepath)
+    try:
+        # Multithreaded Arrow parser when available, with known dtypes
+        # and the Date column parsed during the read
+        return pd.read_csv(
+            filepath,
+            engine=_CSV_ENGINE,
+            dtype={col: dtype for col, dtype in _CSV_DTYPES.items() if col in header},
+            parse_dates=['Date'] if 'Date' in header else None,
+        )
+    except (ValueError, TypeError):
+        # Columns that don't match the expected types (e.g. gaps in Volume)
+        df = pd.read_csv(filepath)
+        # Convert Date column to datetime if it exists
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+
+def _build_test_windows(
+    values: np.ndarray,
+    split: float,
+    seq_len: int,
+    normalise: bool,
+    cols_to_norm: List[int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized equivalent of DataLoader.get_test_data
+
+    Takes the test split of `values` (rows x columns), cuts it into every
+    `seq_len` window except the last one (as DataLoader does), and
+    normalises the selected columns of each window to its first row (p / p0 - 1).
+
+    Returns:
+        Tuple of (x, y, y_base)
+    """
+    data_test = values[int(len(values) * split):]
+    num_windows = len(data_test) - seq_len
+    if num_windows <= 0:
+        raise ValueError(f"Not enough test rows ({len(data_test)}) for windows of length {seq_len}")
+
+    # (num_windows, seq_len, features) views, then one copy
+    windows = np.lib.stride_tricks.sliding_window_view(data_test, seq_len, axis=0)[:num_windows]
+    windows = np.ascontiguousarray(windows.transpose(0, 2, 1), dtype=float)
+    y_base = windows[:, 0, [0]].copy()
+
+    if normalise:
+        cols = [c for c in cols_to_norm if c < windows.shape[2]]
+        base = windows[:, :1, cols].copy()
+        base[base == 0] = 1
+        windows[:, :, cols] = windows[:, :, cols] / base - 1
+
+    x = windows[:, :-1, :]
+    y = windows[:, -1, [0]]
+    return x, y, y_base
+
+
+def _read_parquet_sidecar(filepath: str) -> Optional[pd.DataFrame]:
+    """Load the Parquet copy of a CSV if it exists and is at least as new as the CSV"""
+    if not _HAS_PYARROW:
+        return None
+    sidecar = filepath + _SIDECAR_SUFFIX
+    try:
+        if os.stat(sidecar).st_mtime_ns < os.stat(filepath).st_mtime_ns:
+            return None
+        return pd.read_parquet(sidecar, engine='pyarrow')
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable cache {sidecar}: {e}")
+        return None
+
+
+def _write_parquet_sidecar(filepath: str, df: pd.DataFrame) -> None:
+    """Best-effort write of the Parquet copy; a read-only data dir just means no cache"""
+    if not _HAS_PYARROW:
+        return
+    sidecar = filepath + _SIDECAR_SUFFIX
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False)
+        # Atomic rename so concurrent workers never read a partial file
+        os.replace(tmp, sidecar)
+    except Exception as e:
+        print(f"Could not write cache {sidecar}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
 class DataService:
     _instance = None
+    _lock = threading.Lock()
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DataService, cls).__new__(cls)
-            cls._instance._initialized = False
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(DataService, cls).__new__(cls)
+                cls._instance._initialized = False
         return cls._instance
     
     def __init__(self):
-        if not self._initialized:
+        with self._lock:
+            if self._initialized:
+                return
             self.base_path = os.path.join(
                 BASE_DIR,
                 'FNSPID_Financial_News_Dataset-main',
@@ -53,23 +211,49 @@ class DataService:
                 'LSTM-for-Time-Series-Prediction'
             )
             self.data_path = os.path.join(self.base_path, 'data')
+            # (data dir mtime_ns, sorted symbols) and lowercased symbol -> filename,
+            # rebuilt whenever the directory changes
+            self._dir_cache = (None, [])
+            self._symbol_to_filename: Dict[str, str] = {}
+            # LRU of prepare_prediction_data results, keyed on the inputs and the CSV's mtime
+            self._prep_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
             self._initialized = True
     
     @classmethod
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        instance = cls._instance
+        if instance is None or not instance._initialized:
+            # Slow path: waits on the lock if another thread is still initializing
+            instance = cls()
+        return instance
     
     def get_available_stocks(self) -> list:
         """Get list of available stock symbols"""
-        if not os.path.exists(self.data_path):
+        return list(self._scan_data_dir())
+
+    def _scan_data_dir(self) -> list:
+        """List the data directory, reusing the previous scan while its mtime is unchanged"""
+        try:
+            mtime = os.stat(self.data_path).st_mtime_ns
+        except OSError:
+            self._dir_cache = (None, [])
+            self._symbol_to_filename = {}
             return []
-        
-        csv_files = [f for f in os.listdir(self.data_path) if f.endswith('.csv')]
+
+        if self._dir_cache[0] == mtime:
+            return self._dir_cache[1]
+
+        with os.scandir(self.data_path) as it:
+            csv_files = [e.name for e in it if e.name.endswith('.csv') and e.is_file()]
         # Extract stock symbols from filenames (remove .csv extension)
-        symbols = [f.replace('.csv', '').upper() for f in csv_files]
-        return sorted(symbols)
+        symbol_to_filename = {}
+        for f in sorted(csv_files):
+            symbol_to_filename.setdefault(f[:-len('.csv')].lower(), f)
+        symbols = sorted(f.replace('.csv', '').upper() for f in csv_files)
+
+        self._symbol_to_filename = symbol_to_filename
+        self._dir_cache = (mtime, symbols)
+        return symbols
     
     def load_stock_data(self, symbol: str) -> Optional[pd.DataFrame]:
         """
@@ -81,26 +265,93 @@ class DataService:
         Returns:
             DataFrame with stock data or None if not found
         """
-        # Try different case variations
-        possible_files = [
-            f"{symbol}.csv",
-            f"{symbol.upper()}.csv",
-            f"{symbol.lower()}.csv"
-        ]
-        
-        for filename in possible_files:
-            filepath = os.path.join(self.data_path, filename)
-            if os.path.exists(filepath):
+        filepath = self._find_data_file(symbol)
+        if filepath is None:
+            return None
+        return self._load_frame(filepath)
+
+    def _load_frame(self, filepath: str) -> Optional[pd.DataFrame]:
+        """Load a stock CSV, from its Parquet copy when that is current"""
+        df = _read_parquet_sidecar(filepath)
+        if df is not None:
+            return df
+
+        try:
+            df = _read_csv(filepath)
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+            return None
+
+        _write_parquet_sidecar(filepath, df)
+        return df
+
+    def load_latest_row(self, symbol: str) -> Optional[dict]:
+        """
+        Load only the last data row for a symbol, without parsing the whole file
+
+        Args:
+            symbol: Stock symbol (e.g., 'AAPL')
+
+        Returns:
+            Dictionary of column -> value (floats, ISO date string, None for
+            missing values) or None if not found / empty
+        """
+        filepath = self._find_data_file(symbol)
+        if filepath is None:
+            return None
+
+        try:
+            header = _read_header(filepath)
+            with open(filepath, 'rb') as f:
+                # Read backwards from EOF until the chunk holds a complete last line
+                size = f.seek(0, os.SEEK_END)
+                chunk = _TAIL_BYTES
+                while True:
+                    start = max(0, size - chunk)
+                    f.seek(start)
+                    lines = [line for line in f.read(size - start).split(b'\n') if line.strip()]
+                    if start == 0 or len(lines) >= 2:
+                        break
+                    chunk *= 2
+        except Exception as e:
+            print(f"Error loading {filepath}: {e}")
+            return None
+
+        # Only the header line present -> no data rows
+        if start == 0 and len(lines) < 2:
+            return None
+
+        values = next(csv.reader([lines[-1].decode('utf-8').rstrip('\r')]))
+        row = {}
+        for key, value in zip(header, values):
+            if value == '':
+                row[key] = None
+            elif key == 'Date':
+                row[key] = pd.Timestamp(value).isoformat()
+            else:
                 try:
-                    df = pd.read_csv(filepath)
-                    # Convert Date column to datetime if it exists
-                    if 'Date' in df.columns:
-                        df['Date'] = pd.to_datetime(df['Date'])
-                    return df
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-        
-        return None
+                    row[key] = float(value)
+                except ValueError:
+                    row[key] = value
+        return row
+
+    def get_data_version(self, symbol: str) -> Optional[int]:
+        """Modification time (ns) of a symbol's CSV, for callers caching data derived from it"""
+        filepath = self._find_data_file(symbol)
+        if filepath is None:
+            return None
+        try:
+            return os.stat(filepath).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _find_data_file(self, symbol: str) -> Optional[str]:
+        """Return the CSV path for a symbol (case-insensitive), or None if there is none"""
+        self._scan_data_dir()
+        filename = self._symbol_to_filename.get(symbol.lower())
+        if filename is None:
+            return None
+        return os.path.join(self.data_path, filename)
     
     def prepare_prediction_data(
         self, 
@@ -118,69 +369,75 @@ class DataService:
             use_recent: If True, use most recent data; if False, use test data
         
         Returns:
-            Tuple of (x_test, y_test, y_base) or None if error
+            Tuple of (x_test, y_test, y_base) or None if error.
+            Results are cached and shared between callers; treat them as read-only.
         """
-        # Load configuration - try model-specific path first, then fallback to LSTM
-        model_base_paths = {
-            'LSTM': os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'LSTM-for-Time-Series-Prediction'),
-            'GRU': os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'GRU-for-Time-Series-Prediction'),
-            'CNN': os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'CNN-for-Time-Series-Prediction'),
-            'RNN': os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'RNN-for-Time-Series-Prediction'),
-        }
-        
-        # Try model-specific config first
-        model_base_path = model_base_paths.get(model_type, self.base_path)
-        config_path = os.path.join(model_base_path, f"{sentiment_type}_config.json")
-        
-        # Fallback to LSTM config if model-specific doesn't exist
-        if not os.path.exists(config_path):
-            config_path = os.path.join(self.base_path, f"{sentiment_type}_config.json")
-        
-        if not os.path.exists(config_path):
+        data_file = self._find_data_file(symbol)
+        if data_file is None:
             return None
         
-        import json
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        try:
+            mtime = os.stat(data_file).st_mtime_ns
+        except OSError:
+            return None
+        cache_key = (data_file, sentiment_type, model_type, use_recent, mtime)
+        cached = self._prep_cache.get(cache_key)
+        if cached is not None:
+            self._prep_cache.move_to_end(cache_key)
+            return cached
         
-        # Load data
-        data_file = os.path.join(self.data_path, f"{symbol}.csv")
-        # Try different case variations
-        if not os.path.exists(data_file):
-            for case_var in [symbol.upper(), symbol.lower()]:
-                alt_file = os.path.join(self.data_path, f"{case_var}.csv")
-                if os.path.exists(alt_file):
-                    data_file = alt_file
-                    break
-            else:
-                return None
+        # Configs are parsed once by ModelService (model-specific, falling back to LSTM).
+        # Imported here so the data endpoints don't pull in Keras.
+        from .model_service import ModelService
+        config = ModelService.get_instance().get_config(model_type, sentiment_type)
+        if not _REQUIRED_DATA_KEYS.issubset(config.get('data', {})):
+            # Built-in default config: no config file for this model/sentiment
+            return None
         
         try:
-            if DataLoader is None:
-                raise ImportError("DataLoader not available")
-            
-            # Initialize DataLoader
-            data_loader = DataLoader(
-                data_file,
-                config['data']['train_test_split'],
-                config['data']['columns'],
-                config['data']['columns_to_normalise'],
-                config['data']['prediction_length']
-            )
-            
-            # Get test data
-            x_test, y_test, y_base = data_loader.get_test_data(
-                seq_len=config['data']['sequence_length'],
-                normalise=config['data']['normalise'],
-                cols_to_norm=config['data']['columns_to_normalise']
-            )
+            if _FAST_WINDOWS:
+                # Same windows as DataLoader.get_test_data, built without Python loops
+                df = self._load_frame(data_file)
+                if df is None:
+                    return None
+                x_test, y_test, y_base = _build_test_windows(
+                    df[config['data']['columns']].to_numpy(dtype=float),
+                    split=config['data']['train_test_split'],
+                    seq_len=config['data']['sequence_length'],
+                    normalise=config['data']['normalise'],
+                    cols_to_norm=config['data']['columns_to_normalise'],
+                )
+            else:
+                if DataLoader is None:
+                    raise ImportError("DataLoader not available")
+                
+                # Initialize DataLoader
+                data_loader = DataLoader(
+                    data_file,
+                    config['data']['train_test_split'],
+                    config['data']['columns'],
+                    config['data']['columns_to_normalise'],
+                    config['data']['prediction_length']
+                )
+                
+                # Get test data
+                x_test, y_test, y_base = data_loader.get_test_data(
+                    seq_len=config['data']['sequence_length'],
+                    normalise=config['data']['normalise'],
+                    cols_to_norm=config['data']['columns_to_normalise']
+                )
             
             if use_recent:
                 # Use the most recent sequence for prediction
                 x_test = x_test[-1:] if len(x_test) > 0 else x_test
             
-            return (x_test, y_test, y_base)
-        except Exception as e:
+            result = (x_test, y_test, y_base)
+            self._prep_cache[cache_key] = result
+            if len(self._prep_cache) > _PREP_CACHE_SIZE:
+                self._prep_cache.popitem(last=False)
+            return result
+        except (KeyError, IndexError, ValueError, ImportError, OSError) as e:
+            # Missing columns, too few rows for a window, or unreadable data
             print(f"Error preparing data for {symbol}: {e}")
             return None
     
@@ -202,19 +459,12 @@ class DataService:
         if limit:
             df = df.tail(limit)
         
-        # Convert to list of dictionaries
-        data = df.to_dict('records')
-        
         # Convert datetime to string for JSON serialization
-        for record in data:
-            if 'Date' in record and pd.notna(record['Date']):
-                record['Date'] = str(record['Date'])
-            # Convert numpy types to native Python types
-            for key, value in record.items():
-                if isinstance(value, (np.integer, np.floating)):
-                    record[key] = float(value)
-                elif pd.isna(value):
-                    record[key] = None
+        if 'Date' in df.columns:
+            df = df.assign(Date=df['Date'].astype(str).where(df['Date'].notna(), None))
+        
+        # Convert to list of dictionaries of native Python values, NaN/NaT -> None
+        data = df.astype(object).where(df.notna(), None).to_dict('records')
         
         return {
             'symbol': symbol.upper(),
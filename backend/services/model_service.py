@@ -3,10 +3,28 @@ Unified Model Service for loading and using all model types (LSTM, GRU, CNN, RNN
 """
 import os
 import json
+import inspect
+import threading
 import numpy as np
 from typing import Optional, Tuple, Dict
 from keras.models import load_model as keras_load_model
-import sys
+
+try:
+    import tensorflow as tf
+except ImportError:
+    # Non-TensorFlow Keras backend: models are called directly
+    tf = None
+
+# Keras 3 needs safe_mode=False for the legacy .h5 files; older releases
+# reject the keyword, so decide once instead of catching TypeError per load
+try:
+    _HAS_SAFE_MODE = 'safe_mode' in inspect.signature(keras_load_model).parameters
+except (TypeError, ValueError):
+    _HAS_SAFE_MODE = False
+_LOAD_KWARGS = {'compile': False, **({'safe_mode': False} if _HAS_SAFE_MODE else {})}
+
+# What a bad or incompatible model file raises (h5py I/O, config deserialization)
+_LOAD_ERRORS = (OSError, ValueError, TypeError, KeyError, AttributeError)
 
 # Get the base directory (project root)
 from .utils import get_base_dir
@@ -20,12 +38,6 @@ MODEL_PATHS = {
     'RNN': os.path.join(BASE_DIR, 'FNSPID_Financial_News_Dataset-main', 'dataset_test', 'RNN-for-Time-Series-Prediction'),
 }
 
-# Add model core paths to sys.path
-for model_type, base_path in MODEL_PATHS.items():
-    core_path = os.path.join(base_path, 'core')
-    if os.path.exists(core_path) and core_path not in sys.path:
-        sys.path.insert(0, core_path)
-
 # Generic Model wrapper that works with all model types
 class Model:
     """Generic model wrapper that can load and use any Keras model"""
@@ -33,6 +45,7 @@ class Model:
     def __init__(self):
         self.model = None
         self.model_type = None
+        self._predict_fn = None
     
     def load_model(self, filepath, model_type='LSTM'):
         """Load a Keras model from file with compatibility handling for old Keras models"""
@@ -75,114 +88,141 @@ class Model:
                 'SimpleRNN': CompatibleSimpleRNN,
             }
             
-            # Try loading with custom_objects and safe_mode parameter handling
+            # One load per attempt: kwargs are chosen from the detected Keras API
             try:
-                # For Keras 3.0+, try with safe_mode=False
-                try:
-                    self.model = keras_load_model(filepath, compile=False, safe_mode=False, custom_objects=custom_objects)
-                except TypeError:
-                    # safe_mode doesn't exist in older versions
-                    self.model = keras_load_model(filepath, compile=False, custom_objects=custom_objects)
-                
-                self.model_type = model_type
+                self.model = keras_load_model(filepath, custom_objects=custom_objects, **_LOAD_KWARGS)
                 print(f"Model loaded successfully from {filepath}")
-                return True
-            except Exception as e1:
+            except _LOAD_ERRORS as e1:
                 print(f"Error loading with custom_objects: {e1}")
                 # Fallback: try without custom_objects (in case the issue is something else)
                 try:
-                    try:
-                        self.model = keras_load_model(filepath, compile=False, safe_mode=False)
-                    except TypeError:
-                        self.model = keras_load_model(filepath, compile=False)
-                    self.model_type = model_type
+                    self.model = keras_load_model(filepath, **_LOAD_KWARGS)
                     print(f"Model loaded without custom_objects from {filepath}")
-                    return True
-                except Exception as e2:
+                except _LOAD_ERRORS as e2:
                     print(f"All loading attempts failed. Last error: {e2}")
                     return False
-                    
         except Exception as e:
+            # Anything else (corrupt checkpoint, h5py/TF errors) is logged so startup continues
             print(f"Unexpected error loading model: {e}")
-            import traceback
-            traceback.print_exc()
             return False
+
+        self.model_type = model_type
+        self._ensure_float32()
+        self._build_predict_fn()
+        return True
     
+    def _ensure_float32(self):
+        """
+        Rebuild models saved with float64 weights (old floatx settings) as float32,
+        so inference never upcasts the float32 input windows
+        """
+        if all(getattr(w.dtype, 'name', w.dtype) == 'float32' for w in self.model.weights):
+            return
+
+        try:
+            from keras.models import clone_model
+            weights = [np.asarray(w, dtype=np.float32) for w in self.model.get_weights()]
+            clone = clone_model(
+                self.model,
+                clone_function=lambda layer: layer.__class__.from_config({**layer.get_config(), 'dtype': 'float32'}),
+            )
+            clone.set_weights(weights)
+            self.model = clone
+            print("Cast model weights to float32")
+        except Exception as e:
+            print(f"Could not cast model to float32, keeping saved dtype: {e}")
+
+    def _build_predict_fn(self):
+        """
+        Wrap the forward pass in a tf.function and trace it once up front,
+        preferring an XLA-compiled version when the model supports it
+        """
+        self._predict_fn = None
+        if tf is None:
+            return
+
+        model = self.model
+        try:
+            dummy = tf.zeros((1,) + tuple(model.input_shape[1:]))
+        except (TypeError, ValueError):
+            dummy = None  # Unknown input dims: trace lazily on first call
+
+        for jit_compile in (True, False):
+            fn = tf.function(lambda x: model(x, training=False), reduce_retracing=True, jit_compile=jit_compile)
+            try:
+                if dummy is not None:
+                    fn(dummy)
+                self._predict_fn = fn
+                return
+            except Exception as e:
+                print(f"Could not trace model (jit_compile={jit_compile}): {e}")
+
     def predict_sequences_multiple_modified(self, data, window_size, prediction_len):
-        """Make predictions using the loaded model"""
-        import numpy as np
-        from numpy import newaxis
-        
+        """
+        Make predictions using the loaded model
+
+        Every `prediction_len`-th window is rolled forward autoregressively;
+        all of those windows advance together, one model call per step.
+
+        Returns:
+            Array of shape (num_sequences, prediction_len)
+        """
         if self.model is None:
             raise ValueError("Model not loaded. Call load_model() first.")
-        
-        prediction_seqs = []
-        
-        # Process data in batches
-        for i in range(0, len(data), prediction_len):
-            curr_frame = data[i].copy()
-            predicted = []
-            
-            for j in range(prediction_len):
-                # Prepare input - ensure correct shape
-                input_data = curr_frame[newaxis, :, :]
-                
-                # Make prediction
-                try:
-                    pred = self.model.predict(input_data, verbose=0)
-                    # Handle different output shapes
-                    if isinstance(pred, np.ndarray):
-                        if pred.ndim > 1:
-                            pred_value = pred[0, 0] if pred.shape[1] > 0 else pred[0]
-                        else:
-                            pred_value = pred[0]
-                    else:
-                        pred_value = float(pred)
-                    
-                    predicted.append(pred_value)
-                    
-                    # Update window for next prediction
-                    curr_frame = curr_frame[1:]
-                    # Insert prediction at the end
-                    if curr_frame.shape[0] < window_size - 1:
-                        curr_frame = np.insert(curr_frame, [curr_frame.shape[0]], predicted[-1], axis=0)
-                    else:
-                        curr_frame = np.insert(curr_frame, [window_size - 2], predicted[-1], axis=0)
-                        
-                except Exception as e:
-                    print(f"Error during prediction step {j}: {e}")
-                    # Use last prediction if available, otherwise use 0
-                    if predicted:
-                        predicted.append(predicted[-1])
-                    else:
-                        predicted.append(0.0)
-            
-            prediction_seqs.append(predicted)
-        
-        return prediction_seqs
+
+        # Private contiguous float32 buffer (the model's compute dtype), shifted in place every step
+        frames = np.array(np.asarray(data)[::prediction_len], dtype=np.float32, order='C')
+        if frames.ndim != 3:
+            raise ValueError(f"Expected data of shape (batch, window, features), got {np.shape(data)}")
+
+        num_seqs = frames.shape[0]
+        out = np.empty((num_seqs, prediction_len), dtype=np.float32)
+
+        for j in range(prediction_len):
+            if self._predict_fn is not None:
+                preds = self._predict_fn(tf.convert_to_tensor(frames, dtype=tf.float32)).numpy()
+            else:
+                preds = np.asarray(self.model(frames, training=False))
+            # First output of each sequence is the next normalized value
+            out[:, j] = preds.reshape(num_seqs, -1)[:, 0]
+
+            # Slide every window by one step, writing the prediction
+            # across all features as the newest row
+            frames[:, :-1] = frames[:, 1:]
+            frames[:, -1] = out[:, j, None]
+
+        return out
 
 class ModelService:
     """Unified service for loading and using all model types"""
     _instance = None
     _models = {}
     _configs = {}
+    # Guards singleton creation/config parsing; model loads take their own lock
+    _lock = threading.Lock()
+    _load_lock = threading.Lock()
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ModelService, cls).__new__(cls)
-            cls._instance._initialized = False
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(ModelService, cls).__new__(cls)
+                cls._instance._initialized = False
         return cls._instance
     
     def __init__(self):
-        if not self._initialized:
-            self._initialized = True
+        with self._lock:
+            if self._initialized:
+                return
             self._load_all_configs()
+            self._initialized = True
     
     @classmethod
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        instance = cls._instance
+        if instance is None or not instance._initialized:
+            # Slow path: waits on the lock if another thread is still initializing
+            instance = cls()
+        return instance
     
     def _load_all_configs(self):
         """Load configurations for all model types"""
@@ -261,21 +301,39 @@ class ModelService:
             print(f"  Searched in: {MODEL_PATHS.get(model_type, 'Unknown')}")
             return None
         
-        try:
+        with self._load_lock:
+            # Another request may have loaded it while we waited
+            if model_key in self._models:
+                return self._models[model_key]
+
             model_wrapper = Model()
             if model_wrapper.load_model(model_path, model_type):
                 self._models[model_key] = model_wrapper
                 print(f"Model loaded successfully: {model_key} from {model_path}")
                 return model_wrapper
-            else:
-                print(f"Failed to load model: {model_key}")
-                return None
-        except Exception as e:
-            print(f"Error loading model {model_key}: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"Failed to load model: {model_key}")
             return None
     
+    def preload(
+        self,
+        model_types=('LSTM',),
+        sentiment_types=('nonsentiment', 'sentiment'),
+        num_csvs_list=(50,)
+    ) -> int:
+        """
+        Load (and trace) the given models ahead of the first request
+        
+        Returns:
+            Number of models loaded
+        """
+        loaded = 0
+        for model_type in model_types:
+            for sentiment_type in sentiment_types:
+                for num_csvs in num_csvs_list:
+                    if self.load_model(model_type, sentiment_type, num_csvs) is not None:
+                        loaded += 1
+        return loaded
+    
     def get_config(self, model_type: str, sentiment_type: str):
         """Get model configuration"""
         if model_type in self._configs:
@@ -316,7 +374,7 @@ class ModelService:
             prediction_length: Number of steps to predict
         
         Returns:
-            Predictions array
+            Predictions array (shape: [num_sequences, prediction_length])
         """
         model = self.load_model(model_type, sentiment_type, num_csvs)
         if model is None:
@@ -332,7 +390,7 @@ class ModelService:
             prediction_len=prediction_length
         )
         
-        return predictions
+        return np.asarray(predictions, dtype=float)
     
     def list_available_models(self) -> Dict:
         """List all available models"""
@@ -344,27 +402,33 @@ class ModelService:
             base_path = MODEL_PATHS[model_type]
             saved_models_path = os.path.join(base_path, 'saved_models')
             
-            if not os.path.exists(saved_models_path):
+            try:
+                # One directory read; DirEntry caches the file type
+                with os.scandir(saved_models_path) as it:
+                    filenames = [
+                        e.name for e in it
+                        if e.name.endswith('.h5') and not e.name.startswith('sp500') and e.is_file()
+                    ]
+            except OSError:
                 continue
             
             models = []
-            for filename in os.listdir(saved_models_path):
-                if filename.endswith('.h5') and not filename.startswith('sp500'):
-                    # Parse filename: MODELTYPE_sentimenttype_numcsvs.h5
-                    parts = filename.replace('.h5', '').split('_')
-                    if len(parts) >= 3:
-                        file_model_type = parts[0]
-                        file_sentiment = parts[1]
-                        try:
-                            file_num_csvs = int(parts[2])
-                            models.append({
-                                'filename': filename,
-                                'sentiment_type': file_sentiment,
-                                'num_csvs': file_num_csvs,
-                                'key': f"{file_model_type}_{file_sentiment}_{file_num_csvs}"
-                            })
-                        except ValueError:
-                            continue
+            for filename in filenames:
+                # Parse filename: MODELTYPE_sentimenttype_numcsvs.h5
+                parts = filename.replace('.h5', '').split('_')
+                if len(parts) >= 3:
+                    file_model_type = parts[0]
+                    file_sentiment = parts[1]
+                    try:
+                        file_num_csvs = int(parts[2])
+                        models.append({
+                            'filename': filename,
+                            'sentiment_type': file_sentiment,
+                            'num_csvs': file_num_csvs,
+                            'key': f"{file_model_type}_{file_sentiment}_{file_num_csvs}"
+                        })
+                    except ValueError:
+                        continue
             
             if models:
                 available[model_type] = models
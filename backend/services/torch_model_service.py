@@ -10,7 +10,11 @@ We implement lightweight inference-only loading and prediction, with caching.
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
@@ -18,15 +22,39 @@ import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 
-from .utils import get_base_dir
+from .utils import force_cpu, get_base_dir
 from .data_service import DataService
 
 
+@functools.lru_cache(maxsize=1)
 def _device():
+    # Resolved once per process: the CUDA probe initialises the driver
     import torch
+    if force_cpu():
+        return torch.device("cpu")
     return torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 
+def _autocast():
+    """FP16 autocast for forward passes on CUDA; a no-op on CPU"""
+    import torch
+    if _device().type == "cuda":
+        return torch.autocast("cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+
+def _as_input(batch: np.ndarray):
+    """
+    Float32 tensor for a (batch, ...) array on the inference device; on CUDA the
+    copy goes through pinned memory without blocking
+    """
+    import torch
+    x = torch.from_numpy(np.ascontiguousarray(batch, dtype=np.float32))
+    if _device().type == "cuda":
+        return x.pin_memory().to(_device(), non_blocking=True)
+    return x
+
+
 def _ensure_col(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.DataFrame:
     if col not in df.columns:
         df = df.copy()
@@ -34,14 +62,405 @@ def _ensure_col(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.DataFram
     return df
 
 
-def _split_and_scale(raw: np.ndarray, split_ratio: float = 0.85) -> Tuple[np.ndarray, MinMaxScaler]:
+@functools.lru_cache(maxsize=1)
+def _timesnet_class():
+    """The TimesNet module class, defined once on first use so torch stays a lazy import"""
+    import torch
+    import torch.nn as nn
+
+    # Architecture matches dataset_test/.../run.py
+    class TimesNet(nn.Module):
+        def __init__(self, input_features: int, sequence_length: int, output_length: int, num_layers: int = 4):
+            super().__init__()
+            self.conv_layers = nn.ModuleList()
+            for i in range(num_layers):
+                in_channels = input_features if i == 0 else 64
+                self.conv_layers.append(nn.Conv1d(in_channels=in_channels, out_channels=64, kernel_size=3, padding=1))
+            self.flatten = nn.Flatten()
+            self.dense = nn.Linear(64 * sequence_length, output_length)
+
+        def forward(self, x):
+            for conv in self.conv_layers:
+                x = torch.relu(conv(x))
+            x = self.flatten(x)
+            x = self.dense(x)
+            return x
+
+    return TimesNet
+
+
+# Opt-in torch.compile of TimesNet (static shapes; CUDA graphs via reduce-overhead on GPU)
+# instead of TorchScript freezing
+_TORCH_COMPILE = os.getenv("FINTREND_TORCH_COMPILE") == "1"
+
+
+def _compile_for_inference(model, example):
+    """torch.compile `model` for the fixed shape of `example` and warm it up; None on failure"""
+    import torch
+
+    mode = "reduce-overhead" if example.is_cuda else "default"
+    try:
+        compiled = torch.compile(model, mode=mode, dynamic=False, fullgraph=True)
+        with torch.no_grad(), _autocast():
+            expected = model(example).float()
+            # Compilation (and CUDA graph capture) happens here rather than on the first request
+            for _ in range(3):
+                out = compiled(example).float()
+        tol = 1e-2 if example.is_cuda else 1e-5
+        if not torch.allclose(out, expected, rtol=tol * 10, atol=tol):
+            raise RuntimeError("compiled output differs from eager output")
+        return compiled
+    except Exception as e:
+        print(f"torch.compile failed, freezing instead: {e}")
+        return None
+
+
+# Replay a captured CUDA graph for batch-of-one forwards (FINTREND_CUDA_GRAPHS=0 disables)
+_CUDA_GRAPHS = os.getenv("FINTREND_CUDA_GRAPHS", "1") != "0"
+
+
+class _CudaGraphModule:
+    """
+    Wraps a model with a CUDA graph captured for one fixed input shape: matching
+    inputs are copied into the static buffer and the whole forward is a single
+    graph launch. Other shapes (batched predictions) run the model directly.
+    """
+
+    def __init__(self, model, example) -> None:
+        import torch
+
+        self._model = model
+        self._static_input = example.clone()
+
+        # Warm up on a side stream so lazy initialisation is not captured
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.no_grad(), _autocast(), torch.cuda.stream(stream):
+            for _ in range(3):
+                model(self._static_input)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        self._graph = torch.cuda.CUDAGraph()
+        with torch.no_grad(), _autocast(), torch.cuda.graph(self._graph):
+            self._static_output = model(self._static_input)
+
+    def __call__(self, x):
+        if x.shape != self._static_input.shape:
+            return self._model(x)
+        self._static_input.copy_(x)
+        self._graph.replay()
+        # The static output is overwritten by the next replay
+        return self._static_output.clone()
+
+
+def _capture_cuda_graph(model, example):
+    """CUDA-graph wrapper for `model` on GPU; the model itself on CPU or if capture fails"""
+    if not (_CUDA_GRAPHS and example.is_cuda):
+        return model
+    try:
+        return _CudaGraphModule(model, example)
+    except Exception as e:
+        print(f"CUDA graph capture failed, launching kernels per call: {e}")
+        return model
+
+
+def _load_state_dict(model_path: str):
+    """
+    Memory-map a checkpoint's tensors on CPU instead of reading the whole file;
+    load_state_dict then copies them onto the model's device
+    """
+    import torch
+    try:
+        return torch.load(model_path, map_location="cpu", mmap=True, weights_only=True)
+    except RuntimeError:
+        # Legacy (non-zipfile) checkpoints cannot be memory-mapped
+        return torch.load(model_path, map_location="cpu", weights_only=True)
+
+
+def _freeze_for_inference(model, example, mkldnn: bool = False):
+    """
+    Trace an eval-mode model on `example` and freeze it into a TorchScript module.
+
+    Tracing also covers the dataset Transformer, which TorchScript cannot script. The
+    trace is recorded on a single-row `example` but predict_batch calls it with any
+    batch size; the batch dimension only flows through tensor shape ops, which the
+    tracer records symbolically. The traced module is checked against eager output
+    once; any failure keeps the eager model.
+
+    With `mkldnn` on CPU, optimize_for_inference additionally rewrites convolutions
+    to oneDNN kernels (a win for TimesNet's Conv1d stack, not for the Transformer).
+    """
+    import warnings
+    import torch
+
+    try:
+        # Traced under autocast so the FP16 casts are recorded in the graph on CUDA
+        with torch.no_grad(), _autocast(), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # Eager reference first; this also populates state (e.g. attention maps)
+            # that the tracer probes through module properties
+            expected = model(example).float()
+            frozen = torch.jit.freeze(torch.jit.trace(model, example))
+            if mkldnn and not example.is_cuda and torch.backends.mkldnn.is_available():
+                frozen = torch.jit.optimize_for_inference(frozen)
+            # Warm-up runs let the profiling executor settle on fused kernels
+            for _ in range(2):
+                out = frozen(example).float()
+            tol = 1e-2 if example.is_cuda else 1e-5
+            if not torch.allclose(out, expected, rtol=tol * 10, atol=tol):
+                raise RuntimeError("traced output differs from eager output")
+        return frozen
+    except Exception as e:
+        print(f"TorchScript freeze failed, using eager model: {e}")
+        return model
+
+
+# Opt-in on-disk cache of frozen modules next to each checkpoint
+_JIT_CACHE = os.getenv("FINTREND_JIT_CACHE") == "1"
+
+
+def _jit_cache_path(model_path: str) -> str:
+    # Traced graphs bake in the device they were traced on
+    return f"{model_path}.{_device().type}.ts"
+
+
+def _load_jit_cache(model_path: str):
+    """Load the frozen TorchScript copy of a checkpoint if caching is on and it is up to date"""
+    if not _JIT_CACHE:
+        return None
+    import torch
+
+    ts_path = _jit_cache_path(model_path)
+    try:
+        if os.path.getmtime(ts_path) < os.path.getmtime(model_path):
+            return None
+        return torch.jit.load(ts_path, map_location=_device())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable cache {ts_path}: {e}")
+        return None
+
+
+def _save_jit_cache(model_path: str, model) -> None:
+    """Best-effort write of a frozen module; eager fallbacks are not cached"""
+    import torch
+
+    if not _JIT_CACHE or not isinstance(model, torch.jit.ScriptModule):
+        return
+    ts_path = _jit_cache_path(model_path)
+    tmp = f"{ts_path}.{os.getpid()}.tmp"
+    try:
+        torch.jit.save(model, tmp)
+        # Atomic rename so concurrent workers never read a partial file
+        os.replace(tmp, ts_path)
+    except Exception as e:
+        print(f"Could not write cache {ts_path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+# Opt-in ONNX Runtime (TensorRT FP16, then CUDA) execution of the Transformer on GPUs
+_USE_TRT = os.getenv("FINTREND_TRT") == "1"
+
+
+class _OrtModule:
+    """Callable stand-in for the Transformer backed by an ONNX Runtime session on CUDA"""
+
+    def __init__(self, session, d_output: int) -> None:
+        self._session = session
+        self._input = session.get_inputs()[0].name
+        self._output = session.get_outputs()[0].name
+        self._d_output = d_output
+        # Exports made before the batch axis was dynamic pin it to 1
+        batch_dim = session.get_inputs()[0].shape[0]
+        self._fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+
+    def __call__(self, x):
+        import torch
+
+        if self._fixed_batch is not None and x.shape[0] != self._fixed_batch:
+            return torch.cat([self(x[i:i + 1]) for i in range(x.shape[0])])
+        x = x.contiguous()
+        out = torch.empty((x.shape[0], self._d_output), dtype=torch.float32, device=x.device)
+        # Bind the torch CUDA buffers directly: no host round trip per call
+        binding = self._session.io_binding()
+        binding.bind_input(self._input, "cuda", x.device.index or 0, np.float32, tuple(x.shape), x.data_ptr())
+        binding.bind_output(self._output, "cuda", out.device.index or 0, np.float32, tuple(out.shape), out.data_ptr())
+        self._session.run_with_iobinding(binding)
+        return out
+
+
+def _trt_enabled() -> bool:
+    return _USE_TRT and _device().type == "cuda"
+
+
+def _export_onnx(model, model_path: str, example) -> None:
+    """Export the eager model to `<model>.pt.onnx` unless an up-to-date export exists"""
+    import torch
+
+    onnx_path = f"{model_path}.onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path):
+        return
+    tmp = f"{onnx_path}.{os.getpid()}.tmp"
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                model, (example,), tmp, opset_version=17, input_names=["x"], output_names=["y"],
+                dynamic_axes={"x": {0: "batch"}, "y": {0: "batch"}}, dynamo=False,
+            )
+        os.replace(tmp, onnx_path)
+    except Exception as e:
+        print(f"ONNX export failed for {os.path.basename(model_path)}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _load_trt_session(model_path: str, d_output: int) -> Optional[_OrtModule]:
+    """
+    Open the exported ONNX model with the TensorRT execution provider (FP16, engines
+    cached next to the checkpoint), falling back to plain CUDA kernels
+    """
+    onnx_path = f"{model_path}.onnx"
+    if not os.path.exists(onnx_path):
+        return None
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("FINTREND_TRT=1 but onnxruntime-gpu is not installed")
+        return None
+
+    providers = [
+        ("TensorrtExecutionProvider", {
+            "trt_fp16_enable": True,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": os.path.dirname(model_path),
+        }),
+        "CUDAExecutionProvider",
+    ]
+    try:
+        session = ort.InferenceSession(onnx_path, providers=providers)
+    except Exception as e:
+        print(f"Could not create ONNX Runtime session for {os.path.basename(onnx_path)}: {e}")
+        return None
+    print(f"Transformer {os.path.basename(model_path)} running on {session.get_providers()[0]}")
+    return _OrtModule(session, d_output)
+
+
+def _split_and_scale(
+    raw: np.ndarray, split_ratio: float = 0.85, tail: Optional[int] = None
+) -> Tuple[np.ndarray, MinMaxScaler]:
+    """
+    Fit a MinMaxScaler on the first `split_ratio` of the rows and scale `raw`, or only
+    its last `tail` rows when that is all the caller needs, keeping raw's dtype.
+    """
     split_idx = int(split_ratio * len(raw))
-    raw_train = raw[:split_idx]
-    scaler = MinMaxScaler().fit(raw_train)
-    scaled = scaler.transform(raw)
+    scaler = MinMaxScaler().fit(raw[:split_idx])
+    rows = raw if tail is None else raw[-tail:]
+    # Same arithmetic as scaler.transform, without its validation copy
+    scaled = rows * scaler.scale_
+    scaled += scaler.min_
     return scaled, scaler
 
 
+# Columns every model variant draws from; each symbol's are extracted once as float32
+_FEATURE_COLUMNS = ["Volume", "Open", "High", "Low", "Close", "Scaled_sentiment"]
+_FEATURE_INDEX = {col: i for i, col in enumerate(_FEATURE_COLUMNS)}
+
+# Per-service LRU sizes: feature matrices per symbol, (scaled window, scaler) per symbol/columns
+_FEATURES_CACHE_SIZE = 64
+_WINDOW_CACHE_SIZE = 64
+
+
+def _lru_put(cache: OrderedDict, key, value, maxsize: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _symbol_features(
+    cache: "OrderedDict[str, Tuple[int, np.ndarray, frozenset, Optional[float]]]",
+    symbol: str,
+) -> Optional[Tuple[int, np.ndarray, frozenset, Optional[float]]]:
+    """
+    (data version, float32 matrix of _FEATURE_COLUMNS, columns present, latest close)
+    for a symbol; reloaded from DataService only when its CSV changes
+    """
+    data = DataService.get_instance()
+    version = data.get_data_version(symbol)
+    if version is None:
+        return None
+    key = symbol.upper()
+    hit = cache.get(key)
+    if hit is not None and hit[0] == version:
+        cache.move_to_end(key)
+        return hit
+
+    df = data.load_stock_data(symbol)
+    if df is None:
+        return None
+    df = _ensure_col(df, "Scaled_sentiment", 0.0)
+    present = frozenset(c for c in _FEATURE_COLUMNS if c in df.columns)
+    features = np.ascontiguousarray(df.reindex(columns=_FEATURE_COLUMNS).to_numpy(dtype=np.float32))
+    latest_close = float(df["Close"].iloc[-1]) if "Close" in df.columns else None
+    entry = (version, features, present, latest_close)
+    _lru_put(cache, key, entry, _FEATURES_CACHE_SIZE)
+    return entry
+
+
+def _scaled_window(
+    cache: "OrderedDict[tuple, Tuple[np.ndarray, MinMaxScaler]]",
+    symbol: str,
+    features: Tuple[int, np.ndarray, frozenset, Optional[float]],
+    cols: List[str],
+    input_len: int = 50,
+) -> Tuple[np.ndarray, MinMaxScaler]:
+    """
+    Last `input_len` scaled rows of the symbol's `cols` and the scaler fitted on the training split.
+
+    The scaler is only refit when the symbol's data changes; the returned window
+    is shared between calls and must not be modified.
+    """
+    version, matrix, present, _ = features
+    key = (symbol.upper(), tuple(cols), version)
+    hit = cache.get(key)
+    if hit is not None:
+        cache.move_to_end(key)
+        return hit
+
+    missing = [c for c in cols if c not in present]
+    if missing:
+        raise ValueError(f"Missing columns for {symbol}: {', '.join(missing)}")
+
+    # float32 end to end: the models take float32 and MinMaxScaler preserves the dtype
+    data = matrix[:, [_FEATURE_INDEX[c] for c in cols]]
+    window, scaler = _split_and_scale(data, split_ratio=0.85, tail=input_len)
+    entry = (window, scaler)
+    _lru_put(cache, key, entry, _WINDOW_CACHE_SIZE)
+    return entry
+
+
+def _inverse_close(scalers: List[MinMaxScaler], values: np.ndarray, close_index: int) -> np.ndarray:
+    """
+    Unscale close predictions of shape (batch, steps), one scaler per row.
+
+    Closed form of MinMaxScaler.inverse_transform for a single column, so no
+    placeholder matrix with every feature is needed.
+    """
+    mins = np.array([s.min_[close_index] for s in scalers])[:, None]
+    scales = np.array([s.scale_[close_index] for s in scalers])[:, None]
+    return (np.asarray(values, dtype=float) - mins) / scales
+
+
+# Guards creation of the service singletons
+_INSTANCE_LOCK = threading.Lock()
+
+
 @dataclass(frozen=True)
 class TorchPrediction:
     predictions: List[float]
@@ -62,11 +481,16 @@ class TimesNetService:
             "model_saved",
         )
         self._cache: Dict[str, object] = {}
+        self._load_lock = threading.Lock()
+        self._features_cache: "OrderedDict[str, Tuple[int, np.ndarray, frozenset, Optional[float]]]" = OrderedDict()
+        self._window_cache: "OrderedDict[tuple, Tuple[np.ndarray, MinMaxScaler]]" = OrderedDict()
 
     @classmethod
     def get_instance(cls) -> "TimesNetService":
         if cls._instance is None:
-            cls._instance = cls()
+            with _INSTANCE_LOCK:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     def _model_path(self, sentiment_type: str, num_csvs: int) -> str:
@@ -75,93 +499,101 @@ class TimesNetService:
 
     def _load_model(self, sentiment_type: str, num_csvs: int):
         import torch
-        import torch.nn as nn
 
         key = f"TIMESNET_{sentiment_type}_{num_csvs}"
         if key in self._cache:
             return self._cache[key]
 
-        model_path = self._model_path(sentiment_type, num_csvs)
-        if not os.path.exists(model_path):
-            raise ValueError(f"Model not available: TIMESNET_{sentiment_type}_{num_csvs}")
-
-        # Architecture matches dataset_test/.../run.py
-        class TimesNet(nn.Module):
-            def __init__(self, input_features: int, sequence_length: int, output_length: int, num_layers: int = 4):
-                super().__init__()
-                self.conv_layers = nn.ModuleList()
-                for i in range(num_layers):
-                    in_channels = input_features if i == 0 else 64
-                    self.conv_layers.append(nn.Conv1d(in_channels=in_channels, out_channels=64, kernel_size=3, padding=1))
-                self.flatten = nn.Flatten()
-                self.dense = nn.Linear(64 * sequence_length, output_length)
-
-            def forward(self, x):
-                for conv in self.conv_layers:
-                    x = torch.relu(conv(x))
-                x = self.flatten(x)
-                x = self.dense(x)
-                return x
-
-        input_features = 4 if sentiment_type == "sentiment" else 3
-        sequence_length = 50
-        output_length = 3
-
-        model = TimesNet(input_features, sequence_length, output_length, num_layers=4).to(_device())
-        model.load_state_dict(torch.load(model_path, map_location=_device()))
-        model.eval()
-
-        self._cache[key] = model
-        return model
-
-    def predict(self, symbol: str, sentiment_type: str, num_csvs: int, prediction_length: int) -> TorchPrediction:
-        # Models are trained for output_length=3 only
-        if prediction_length != 3:
-            raise ValueError("TimesNet only supports prediction_length=3 with the provided saved models.")
-
-        df = DataService.get_instance().load_stock_data(symbol)
-        if df is None or len(df) < 60:
+        # Double-checked: concurrent cold requests build each model only once
+        with self._load_lock:
+            if key in self._cache:
+                return self._cache[key]
+
+            model_path = self._model_path(sentiment_type, num_csvs)
+            if not os.path.exists(model_path):
+                raise ValueError(f"Model not available: TIMESNET_{sentiment_type}_{num_csvs}")
+
+            cached = _load_jit_cache(model_path)
+            if cached is not None:
+                example = torch.zeros(1, 4 if sentiment_type == "sentiment" else 3, 50, device=_device())
+                cached = _capture_cuda_graph(cached, example)
+                self._cache[key] = cached
+                return cached
+
+            input_features = 4 if sentiment_type == "sentiment" else 3
+            sequence_length = 50
+            output_length = 3
+
+            dev = _device()
+            model = _timesnet_class()(input_features, sequence_length, output_length, num_layers=4).to(dev)
+            model.load_state_dict(_load_state_dict(model_path))
+            model.eval()
+            example = torch.zeros(1, input_features, sequence_length, device=dev)
+            compiled = _compile_for_inference(model, example) if _TORCH_COMPILE else None
+            if compiled is not None:
+                model = compiled
+            else:
+                model = _freeze_for_inference(model, example, mkldnn=True)
+                _save_jit_cache(model_path, model)
+                model = _capture_cuda_graph(model, example)
+
+            self._cache[key] = model
+            return model
+
+    def _prepare_window(self, symbol: str, sentiment_type: str) -> Tuple[np.ndarray, MinMaxScaler, Optional[float]]:
+        """Scaled last input window, its scaler and latest close for one symbol"""
+        features = _symbol_features(self._features_cache, symbol)
+        if features is None or len(features[1]) < 60:
             raise ValueError(f"Not enough data for symbol: {symbol}")
 
         if sentiment_type == "sentiment":
-            df = _ensure_col(df, "Scaled_sentiment", 0.0)
             cols = ["Volume", "Open", "Close", "Scaled_sentiment"]
         else:
             cols = ["Volume", "Open", "Close"]
 
-        data = df[cols].astype(float).values
-        scaled, scaler = _split_and_scale(data, split_ratio=0.85)
+        x_last, scaler = _scaled_window(self._window_cache, symbol, features, cols, input_len=50)  # (50, features)
+        return x_last, scaler, features[3]
 
-        input_len = 50
-        x_last = scaled[-input_len:]  # (50, features)
+    def predict(self, symbol: str, sentiment_type: str, num_csvs: int, prediction_length: int) -> TorchPrediction:
+        return self.predict_batch([symbol], sentiment_type, num_csvs, prediction_length)[0]
+
+    def predict_batch(
+        self, symbols: List[str], sentiment_type: str, num_csvs: int, prediction_length: int
+    ) -> List[TorchPrediction]:
+        """Predict several symbols with one forward pass; results follow the order of `symbols`"""
+        # Models are trained for output_length=3 only
+        if prediction_length != 3:
+            raise ValueError("TimesNet only supports prediction_length=3 with the provided saved models.")
+        if not symbols:
+            return []
+
+        prepared = [self._prepare_window(symbol, sentiment_type) for symbol in symbols]
 
         import torch
-        x_tensor = torch.tensor(x_last, dtype=torch.float32).unsqueeze(0)  # (1, 50, f)
-        x_tensor = x_tensor.transpose(1, 2).to(_device())  # (1, f, 50) for Conv1d
+        x_tensor = _as_input(np.stack([p[0] for p in prepared]))  # (B, 50, f)
+        x_tensor = x_tensor.transpose(1, 2).contiguous()  # (B, f, 50) for Conv1d
 
         model = self._load_model(sentiment_type, num_csvs)
-        with torch.no_grad():
-            y_scaled = model(x_tensor).cpu().numpy().reshape(-1)  # (3,)
-
-        # Inverse transform: build placeholder with correct feature dimension and put close at index 2
-        feat_dim = len(cols)
-        expanded = np.zeros((len(y_scaled), feat_dim), dtype=float)
-        expanded[:, 2] = y_scaled
-        y_inv = scaler.inverse_transform(expanded)[:, 2]
-
-        latest_close = float(df["Close"].iloc[-1]) if "Close" in df.columns else None
-
-        return TorchPrediction(
-            predictions=[float(v) for v in y_inv.tolist()],
-            current_price=latest_close,
-            model_info={
-                "model_type": "TIMESNET",
-                "sentiment_type": sentiment_type,
-                "num_csvs": num_csvs,
-                "sequence_length": 50,
-                "prediction_length": 3,
-            },
-        )
+        with torch.inference_mode(), _autocast():
+            y_batch = model(x_tensor).float().cpu().numpy().reshape(len(prepared), -1)  # (B, 3)
+
+        # Close is column 2 for both feature sets
+        y_inv_batch = _inverse_close([p[1] for p in prepared], y_batch, close_index=2)
+
+        results = []
+        for (_, _, latest_close), y_inv in zip(prepared, y_inv_batch):
+            results.append(TorchPrediction(
+                predictions=[float(v) for v in y_inv.tolist()],
+                current_price=latest_close,
+                model_info={
+                    "model_type": "TIMESNET",
+                    "sentiment_type": sentiment_type,
+                    "num_csvs": num_csvs,
+                    "sequence_length": 50,
+                    "prediction_length": 3,
+                },
+            ))
+        return results
 
 
 class TransformerService:
@@ -183,11 +615,16 @@ class TransformerService:
             "Transformer-for-Time-Series-Prediction",
         )
         self._cache: Dict[str, object] = {}
+        self._load_lock = threading.Lock()
+        self._features_cache: "OrderedDict[str, Tuple[int, np.ndarray, frozenset, Optional[float]]]" = OrderedDict()
+        self._window_cache: "OrderedDict[tuple, Tuple[np.ndarray, MinMaxScaler]]" = OrderedDict()
 
     @classmethod
     def get_instance(cls) -> "TransformerService":
         if cls._instance is None:
-            cls._instance = cls()
+            with _INSTANCE_LOCK:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     def _model_candidates(self, sentiment_type: str, num_csvs: int, layers: int = 4) -> List[str]:
@@ -210,133 +647,171 @@ class TransformerService:
         import torch
 
         model_path = self._pick_model_path(sentiment_type, num_csvs, layers=layers)
-        # Infer input/output dimensions from checkpoint (so we can support both variants).
-        sd = torch.load(model_path, map_location="cpu")
-        emb_w = sd.get("_embedding.weight")
-        lin_w = sd.get("_linear.weight")
-        if emb_w is None or lin_w is None:
-            raise ValueError(f"Transformer checkpoint missing expected keys: {os.path.basename(model_path)}")
-
-        d_input = int(emb_w.shape[1])
-        d_output = int(lin_w.shape[0])
-
         key = f"TRANSFORMER_{os.path.basename(model_path)}"
         if key in self._cache:
             return self._cache[key]
 
-        # Import Transformer from dataset code
-        if self.tst_dir not in sys.path:
-            sys.path.insert(0, self.tst_dir)
-        from tst import Transformer  # type: ignore
-
-        # Match run.py parameters
-        d_model = 32
-        q = 8
-        v = 8
-        h = 8
-        N = layers
-        attention_size = 50
-        dropout = 0.1
-        chunk_mode = None
-        pe = "regular"
-
-        model = Transformer(
-            d_input, d_model, d_output, q, v, h, N,
-            attention_size=attention_size, dropout=dropout, chunk_mode=chunk_mode, pe=pe
-        ).to(_device())
-
-        model.load_state_dict(torch.load(model_path, map_location=_device()))
-        model.eval()
-        self._cache[key] = (model, d_input, d_output, model_path)
-        return self._cache[key]
-
-    def predict(self, symbol: str, sentiment_type: str, num_csvs: int, prediction_length: int) -> TorchPrediction:
-        if prediction_length < 1 or prediction_length > 3:
-            raise ValueError("Transformer supports prediction_length 1..3 in this backend integration.")
+        # Double-checked: concurrent cold requests build each model only once
+        with self._load_lock:
+            if key in self._cache:
+                return self._cache[key]
+
+            # Infer input/output dimensions from checkpoint (so we can support both variants).
+            # The same state_dict is loaded into the model below.
+            sd = _load_state_dict(model_path)
+            emb_w = sd.get("_embedding.weight")
+            lin_w = sd.get("_linear.weight")
+            if emb_w is None or lin_w is None:
+                raise ValueError(f"Transformer checkpoint missing expected keys: {os.path.basename(model_path)}")
+
+            d_input = int(emb_w.shape[1])
+            d_output = int(lin_w.shape[0])
+
+            cached = _load_trt_session(model_path, d_output) if _trt_enabled() else None
+            if cached is None:
+                cached = _load_jit_cache(model_path)
+                if cached is not None:
+                    cached = _capture_cuda_graph(cached, torch.zeros(1, 50, d_input, device=_device()))
+            if cached is not None:
+                self._cache[key] = (cached, d_input, d_output, model_path)
+                return self._cache[key]
+
+            # Import Transformer from dataset code
+            if self.tst_dir not in sys.path:
+                sys.path.insert(0, self.tst_dir)
+            from tst import Transformer  # type: ignore
+
+            # Match run.py parameters
+            d_model = 32
+            q = 8
+            v = 8
+            h = 8
+            N = layers
+            attention_size = 50
+            dropout = 0.1
+            chunk_mode = None
+            pe = "regular"
+
+            dev = _device()
+            model = Transformer(
+                d_input, d_model, d_output, q, v, h, N,
+                attention_size=attention_size, dropout=dropout, chunk_mode=chunk_mode, pe=pe
+            ).to(dev)
+
+            model.load_state_dict(sd)
+            del sd
+            model.eval()
+            example = torch.zeros(1, attention_size, d_input, device=dev)
+
+            session = None
+            if _trt_enabled():
+                _export_onnx(model, model_path, example)
+                session = _load_trt_session(model_path, d_output)
+            if session is not None:
+                model = session
+            else:
+                model = _freeze_for_inference(model, example)
+                _save_jit_cache(model_path, model)
+                model = _capture_cuda_graph(model, example)
+            self._cache[key] = (model, d_input, d_output, model_path)
+            return self._cache[key]
 
-        df = DataService.get_instance().load_stock_data(symbol)
-        if df is None or len(df) < 80:
+    def _prepare_window(self, symbol: str, d_input: int) -> Tuple[np.ndarray, MinMaxScaler, Optional[float], int]:
+        """Scaled last input window, its scaler, latest close and close column index for one symbol"""
+        features = _symbol_features(self._features_cache, symbol)
+        if features is None or len(features[1]) < 80:
             raise ValueError(f"Not enough data for symbol: {symbol}")
 
-        import torch
-        (model, d_input, d_output, model_path) = self._load_model(sentiment_type, num_csvs, layers=4)
-
         # Choose columns based on checkpoint d_input
         # - d_input=6: Volume, Open, High, Low, Close, Scaled_sentiment (multi-output 3x6)
         # - d_input=4: Volume, Open, Close, Scaled_sentiment (single-output)
         # - d_input=3: Volume, Open, Close (single-output)
-        df = _ensure_col(df, "Scaled_sentiment", 0.0)
         if d_input == 6:
             cols = ["Volume", "Open", "High", "Low", "Close", "Scaled_sentiment"]
             close_index = 4
         elif d_input == 4:
             cols = ["Volume", "Open", "Close", "Scaled_sentiment"]
             close_index = 2
-        elif d_input == 3:
+        else:
             cols = ["Volume", "Open", "Close"]
             close_index = 2
-        else:
-            raise ValueError(f"Unsupported Transformer input dimension: {d_input} (file: {os.path.basename(model_path)})")
 
-        data = df[cols].astype(float).values
-        scaled, scaler = _split_and_scale(data, split_ratio=0.85)
+        window, scaler = _scaled_window(self._window_cache, symbol, features, cols, input_len=50)  # (50, d_input)
+        return window, scaler, features[3], close_index
 
-        input_len = 50
-        window = scaled[-input_len:].copy()  # (50, d_input)
+    def predict(self, symbol: str, sentiment_type: str, num_csvs: int, prediction_length: int) -> TorchPrediction:
+        return self.predict_batch([symbol], sentiment_type, num_csvs, prediction_length)[0]
 
-        close_preds_scaled: List[float] = []
+    def predict_batch(
+        self, symbols: List[str], sentiment_type: str, num_csvs: int, prediction_length: int
+    ) -> List[TorchPrediction]:
+        """Predict several symbols with one forward pass per step; results follow the order of `symbols`"""
+        if prediction_length < 1 or prediction_length > 3:
+            raise ValueError("Transformer supports prediction_length 1..3 in this backend integration.")
+        if not symbols:
+            return []
+
+        import torch
+        (model, d_input, d_output, model_path) = self._load_model(sentiment_type, num_csvs, layers=4)
+        if d_input not in (3, 4, 6):
+            raise ValueError(f"Unsupported Transformer input dimension: {d_input} (file: {os.path.basename(model_path)})")
+
+        prepared = [self._prepare_window(symbol, d_input) for symbol in symbols]
+        windows = np.stack([p[0] for p in prepared])  # (B, 50, d_input)
+        batch = len(prepared)
+        close_index = prepared[0][3]
+        scalers = [p[1] for p in prepared]
 
         # If checkpoint is multi-output (d_output == 18), we can get 3 steps in one forward
         if d_output == 18 and d_input == 6:
-            x_tensor = torch.tensor(window, dtype=torch.float32).unsqueeze(0).to(_device())  # (1, 50, 6)
-            with torch.no_grad():
-                out = model(x_tensor)  # (1, 18)
-            out = out.view(1, 3, 6).cpu().numpy()[0]  # (3, 6)
-            out = np.clip(out, 0.0, 1.0)
-            out_inv = scaler.inverse_transform(out)  # (3, 6)
-            close_preds = out_inv[:prediction_length, close_index].tolist()
+            x_tensor = _as_input(windows)  # (B, 50, 6)
+            with torch.inference_mode(), _autocast():
+                out = model(x_tensor).float()  # (B, 18)
+                # Select and clamp the close steps on the device; one small copy back
+                close_scaled = out.view(batch, 3, 6)[:, :prediction_length, close_index].clamp(0.0, 1.0)
+            close_preds = _inverse_close(scalers, close_scaled.cpu().numpy(), close_index)
         # If checkpoint is single-output, generate up to 3 steps autoregressively.
         elif d_output == 1:
-            last_row = window[-1].copy()
-            for _ in range(prediction_length):
-                x_tensor = torch.tensor(window, dtype=torch.float32).unsqueeze(0).to(_device())  # (1, 50, d_input)
-                with torch.no_grad():
-                    out = model(x_tensor)  # (1, 1)
-                pred_scaled = float(out.view(-1)[0].cpu().item())
-                pred_scaled = float(np.clip(pred_scaled, 0.0, 1.0))
-                close_preds_scaled.append(pred_scaled)
-
-                # Update window: shift and append new row with predicted close, keep others same as last row.
-                new_row = last_row.copy()
-                new_row[close_index] = pred_scaled
-                window = np.vstack([window[1:], new_row])
-                last_row = new_row
-
-            expanded = np.tile(last_row, (len(close_preds_scaled), 1))
-            expanded[:, close_index] = np.array(close_preds_scaled)
-            expanded = np.clip(expanded, 0.0, 1.0)
-            inv = scaler.inverse_transform(expanded)
-            close_preds = inv[:, close_index].tolist()
+            # One device buffer holds each window plus room for the rows appended while
+            # rolling forward; step k reads the view [k, k + input_len), so nothing is
+            # shifted or reallocated. Only the final predictions are copied back.
+            input_len = windows.shape[1]
+            buf = np.empty((batch, input_len + prediction_length - 1, d_input), dtype=np.float32)
+            buf[:, :input_len] = windows
+            buf_t = _as_input(buf)  # (B, 50 + steps - 1, d_input)
+            preds_t = torch.empty((batch, prediction_length), dtype=torch.float32, device=_device())
+            with torch.inference_mode(), _autocast():
+                for step in range(prediction_length):
+                    out = model(buf_t[:, step:step + input_len]).float()  # (B, 1)
+                    torch.clamp(out.view(batch, -1)[:, 0], 0.0, 1.0, out=preds_t[:, step])
+
+                    # Append new row with predicted close, keep others same as last row.
+                    row = input_len + step
+                    if row < buf_t.shape[1]:
+                        buf_t[:, row] = buf_t[:, row - 1]
+                        buf_t[:, row, close_index] = preds_t[:, step]
+            preds = preds_t.cpu().numpy()
+
+            close_preds = _inverse_close(scalers, preds, close_index)
         else:
             raise ValueError(
                 f"Unsupported Transformer checkpoint shapes (d_input={d_input}, d_output={d_output}) "
                 f"for file {os.path.basename(model_path)}"
             )
 
-        latest_close = float(df["Close"].iloc[-1]) if "Close" in df.columns else None
-
-        return TorchPrediction(
-            predictions=[float(v) for v in close_preds],
-            current_price=latest_close,
-            model_info={
-                "model_type": "TRANSFORMER",
-                "sentiment_type": sentiment_type,
-                "num_csvs": num_csvs,
-                "sequence_length": 50,
-                "prediction_length": prediction_length,
-                "layers": 4,
-                "checkpoint": os.path.basename(model_path),
-            },
-        )
-
-
+        return [
+            TorchPrediction(
+                predictions=[float(v) for v in preds_for_symbol],
+                current_price=latest_close,
+                model_info={
+                    "model_type": "TRANSFORMER",
+                    "sentiment_type": sentiment_type,
+                    "num_csvs": num_csvs,
+                    "sequence_length": 50,
+                    "prediction_length": prediction_length,
+                    "layers": 4,
+                    "checkpoint": os.path.basename(model_path),
+                },
+            )
+            for (_, _, latest_close, _), preds_for_symbol in zip(prepared, close_preds)
+        ]
@@ -1,10 +1,29 @@
 """
 Utility functions for services
 """
+import asyncio
 import os
+from typing import Any, Awaitable, Callable, Dict
 
 def get_base_dir():
     """Get the base project directory"""
     return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 
+def force_cpu() -> bool:
+    """True when FINTREND_FORCE_CPU=1: run every model on CPU without probing for CUDA"""
+    return os.getenv("FINTREND_FORCE_CPU") == "1"
+
+
+def coalesce(inflight: Dict[str, "asyncio.Task"], key: str, fetch: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    """
+    Join the in-flight fetch for `key` in `inflight`, starting one if none is running,
+    so concurrent cache misses share one upstream call.
+    The shared task is shielded so a disconnecting client cannot cancel it for the others.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return asyncio.shield(task)
@@ -0,0 +1,75 @@
+"""
+Technical indicator kernels used by train_lstm_from_sentiment.py
+Each one matches the pandas expression it replaced; numba/bottleneck are used when installed.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # indicator kernels below run as plain Python loops
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None  # moving_mean falls back to pandas rolling
+
+
+def rsi_wilder(close, com=13):
+    """RSI from Wilder-smoothed gains/losses (EWM, alpha = 1/(1+com), adjust=False) in one pass"""
+    n = len(close)
+    rsi = np.empty(n)
+    if n == 0:
+        return rsi
+    alpha = 1.0 / (1.0 + com)
+    ema_gain = 0.0
+    ema_loss = 0.0
+    rsi[0] = np.nan  # no change on the first day: 0/0
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        ema_gain = (1.0 - alpha) * ema_gain + alpha * gain
+        ema_loss = (1.0 - alpha) * ema_loss + alpha * loss
+        if ema_loss == 0.0:
+            # No losses yet: pandas gives 0/0 -> NaN for a flat run and x/0 -> inf -> 100 for gains only
+            rsi[i] = np.nan if ema_gain == 0.0 else 100.0
+        else:
+            rsi[i] = 100.0 - 100.0 / (1.0 + ema_gain / ema_loss)
+    return rsi
+
+
+def macd_signal(close, fast=12, slow=26, signal=9):
+    """MACD (EMA fast - EMA slow) and its signal line (EMA of MACD), all three EMAs advanced in one pass"""
+    n = len(close)
+    macd = np.empty(n)
+    sig = np.empty(n)
+    if n == 0:
+        return macd, sig
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    a_sig = 2.0 / (signal + 1.0)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    macd[0] = ema_fast - ema_slow
+    sig[0] = macd[0]
+    for i in range(1, n):
+        ema_fast = (1.0 - a_fast) * ema_fast + a_fast * close[i]
+        ema_slow = (1.0 - a_slow) * ema_slow + a_slow * close[i]
+        macd[i] = ema_fast - ema_slow
+        sig[i] = (1.0 - a_sig) * sig[i - 1] + a_sig * macd[i]
+    return macd, sig
+
+
+def moving_mean(values, window):
+    """Trailing mean over `window` rows; NaN until the window is full (pandas rolling(window).mean())"""
+    if bn is not None:
+        return bn.move_mean(values, window, min_count=window)
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+if njit is not None:
+    rsi_wilder = njit(cache=True)(rsi_wilder)
+    macd_signal = njit(cache=True)(macd_signal)
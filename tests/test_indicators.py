@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from indicators import macd_signal, moving_mean, rsi_wilder
+
+
+def _pandas_rsi(close):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+    avg_gain = gain.ewm(com=13, adjust=False).mean()
+    avg_loss = loss.ewm(com=13, adjust=False).mean()
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def test_rsi_matches_pandas():
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(size=500)))
+    np.testing.assert_allclose(rsi_wilder(close.to_numpy()), _pandas_rsi(close).to_numpy(),
+                               rtol=1e-12, equal_nan=True)
+
+
+def test_rsi_flat_start_and_gains_only():
+    # flat first bars (0/0 -> NaN), then only gains (x/0 -> 100), then a loss
+    close = pd.Series([10.0, 10.0, 10.0, 11.0, 12.0, 11.5])
+    rsi = rsi_wilder(close.to_numpy())
+    assert np.isnan(rsi[:3]).all()
+    assert rsi[3] == 100.0 and rsi[4] == 100.0
+    np.testing.assert_allclose(rsi, _pandas_rsi(close).to_numpy(), rtol=1e-12, equal_nan=True)
+
+
+def test_macd_matches_pandas():
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(1).normal(size=500)))
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    got_macd, got_signal = macd_signal(close.to_numpy())
+    np.testing.assert_allclose(got_macd, macd.to_numpy(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(got_signal, signal.to_numpy(), rtol=1e-12, atol=1e-12)
+
+
+def test_moving_mean_matches_pandas():
+    values = np.random.default_rng(2).normal(size=100)
+    np.testing.assert_allclose(moving_mean(values, 7), pd.Series(values).rolling(7).mean().to_numpy(),
+                               rtol=1e-12, equal_nan=True)
@@ -11,6 +11,21 @@ warnings.filterwarnings('ignore')
 import pandas as pd
 import numpy as np
 
+from indicators import rsi_wilder, macd_signal, moving_mean
+
+
+NS_PER_DAY = 86_400_000_000_000
+
+
+def floor_to_day(dates):
+    """Floor a datetime Series to midnight as naive datetime64[ns] (UTC wall time for tz-aware input)
+
+    Works on the int64 nanosecond view, so there is no tz_localize/normalize round trip.
+    """
+    ns = dates.to_numpy(dtype='datetime64[ns]').view('i8')
+    return (ns - ns % NS_PER_DAY).view('datetime64[ns]')
+
+
 print("="*60)
 print("LSTM Training from Pre-generated Sentiment Data")
 print("="*60)
@@ -33,20 +48,42 @@ print(f"Columns: {df.columns.tolist()}")
 print("\nSTEP 2: Fetching stock price data...")
 
 import yfinance as yf
+from joblib import Memory
+
+# Downloads are deterministic per (symbol, start, end): memoize them on disk so re-runs skip the network
+yf_cache = Memory(os.path.join(script_dir, ".yf_cache"), verbose=0)
+cached_download = yf_cache.cache(yf.download)
+
+
+def download_prices(symbol, start, end):
+    """yf.download through the disk cache; empty results are never kept
+
+    yfinance reports network errors, rate limits and unknown tickers by returning an
+    empty frame, so caching one would replay that failure on every later run.
+    """
+    shelved = cached_download.call_and_shelve(symbol, start=start, end=end, progress=False)
+    prices = shelved.get()
+    if prices.empty:
+        shelved.clear()
+    return prices
 
 # Parse dates
 df['Date'] = pd.to_datetime(df['Date'], errors='coerce', utc=True)
 df = df.dropna(subset=['Date'])
-df['Date'] = df['Date'].dt.tz_localize(None).dt.normalize()
+df['Date'] = floor_to_day(df['Date'])
 
 # Get most common stock symbol
 symbol_col = 'Stock_symbol' if 'Stock_symbol' in df.columns else None
 if symbol_col:
-    top_symbol = df[symbol_col].value_counts().index[0]
-    stock_df = df[df[symbol_col] == top_symbol].copy()
+    # Most frequent symbol with one linear bincount; factorize keeps first-seen order, so ties
+    # resolve like value_counts() and NaN (code -1) is skipped
+    codes, symbols = pd.factorize(df[symbol_col])
+    top_symbol = symbols[np.bincount(codes[codes >= 0]).argmax()]
+    # Only the two columns used below, no defensive copy of the whole per-symbol slab
+    stock_df = df.loc[df[symbol_col] == top_symbol, ['Date', 'sentiment_score']]
 else:
     top_symbol = 'AAPL'
-    stock_df = df.copy()
+    stock_df = df[['Date', 'sentiment_score']]
 
 print(f"Training on stock: {top_symbol}")
 
@@ -57,19 +94,18 @@ print(f"Date range: {start_date} to {end_date}")
 
 # Download stock prices
 print(f"Downloading {top_symbol} price data...")
-price_df = yf.download(top_symbol, start=start_date, end=end_date, progress=False)
+price_df = download_prices(top_symbol, start=start_date, end=end_date)
 
 if price_df.empty:
     print("Warning: No price data. Using AAPL fallback...")
     top_symbol = 'AAPL'
-    price_df = yf.download('AAPL', start='2020-01-01', end='2024-01-01', progress=False)
+    price_df = download_prices('AAPL', start='2020-01-01', end='2024-01-01')
 
 price_df = price_df.reset_index()
 
-# Handle MultiIndex columns
+# Handle MultiIndex columns: yfinance labels them (field, ticker), keep the field
 if isinstance(price_df.columns, pd.MultiIndex):
-    price_df.columns = ['_'.join(col).strip() if isinstance(col, tuple) else col for col in price_df.columns]
-    price_df.columns = [c.split('_')[0] for c in price_df.columns]
+    price_df.columns = price_df.columns.get_level_values(0)
 
 print(f"Downloaded {len(price_df)} days of price data")
 
@@ -79,17 +115,22 @@ print(f"Downloaded {len(price_df)} days of price data")
 print("\nSTEP 3: Merging data...")
 
 # Aggregate daily sentiment
-daily_sentiment = stock_df.groupby('Date')['sentiment_score'].mean().reset_index()
-daily_sentiment.columns = ['Date', 'avg_sentiment']
+daily_sentiment = stock_df.groupby('Date', sort=False)['sentiment_score'].mean().rename('avg_sentiment').reset_index()
+del stock_df
 
 # Prepare price data
 price_df['Date'] = pd.to_datetime(price_df['Date'])
 if price_df['Date'].dt.tz is not None:
-    price_df['Date'] = price_df['Date'].dt.tz_localize(None)
-price_df['Date'] = price_df['Date'].dt.normalize()
-
-# Merge
-merged_df = pd.merge(price_df, daily_sentiment, on='Date', how='inner')
+    price_df['Date'] = price_df['Date'].dt.tz_localize(None)  # keep the exchange-local trading day
+price_df['Date'] = floor_to_day(price_df['Date'])
+
+# Merge on the int64 view of the (already day-floored, ns) dates: plain integer hashing
+sentiment_by_day = pd.DataFrame({
+    'Date_i8': daily_sentiment['Date'].to_numpy().view('i8'),
+    'avg_sentiment': daily_sentiment['avg_sentiment'].to_numpy(),
+})
+merged_df = pd.merge(price_df.assign(Date_i8=price_df['Date'].to_numpy().view('i8')),
+                     sentiment_by_day, on='Date_i8', how='inner', sort=False).drop(columns='Date_i8')
 print(f"Merged data shape: {merged_df.shape}")
 
 if len(merged_df) < 100:
@@ -102,38 +143,49 @@ if len(merged_df) < 100:
 # ============================================================
 print("\nSTEP 4: Feature engineering...")
 
-merged_df = merged_df.sort_values('Date').reset_index(drop=True)
+# The inner merge keeps price_df's row order, which yfinance already returns by date
+if not merged_df['Date'].is_monotonic_increasing:
+    merged_df = merged_df.sort_values('Date')
+merged_df = merged_df.reset_index(drop=True)
+
+# Lower-cased name -> column, built once for the price-column lookups here and in STEP 5
+columns_by_lower = {c.lower(): c for c in merged_df.columns}
+
+
+def find_column(name):
+    """Column named `name` (case-insensitive); falls back to the first column containing it"""
+    name = name.lower()
+    if name in columns_by_lower:
+        return columns_by_lower[name]
+    return next((c for low, c in columns_by_lower.items() if name in low), None)
+
 
 # Get Close column
-close_col = [c for c in merged_df.columns if 'Close' in c or 'close' in c][0]
+close_col = find_column('Close')
 print(f"Using close column: {close_col}")
 
-# Lagged sentiment
-for i in range(1, 6):
-    merged_df[f'sentiment_lag{i}'] = merged_df['avg_sentiment'].shift(i)
+sentiment = merged_df['avg_sentiment'].to_numpy(dtype=np.float64)
+
+# Lagged sentiment: row t of the NaN-padded window view is sentiment[t-5..t], reversed gives lag1..lag5
+n_lags = 5
+padded = np.concatenate([np.full(n_lags, np.nan), sentiment])
+lags = np.lib.stride_tricks.sliding_window_view(padded, n_lags + 1)[:, n_lags - 1::-1]
+merged_df[[f'sentiment_lag{i}' for i in range(1, n_lags + 1)]] = lags
 
 # Sentiment moving averages
-merged_df['sentiment_SMA3'] = merged_df['avg_sentiment'].rolling(3).mean()
-merged_df['sentiment_SMA7'] = merged_df['avg_sentiment'].rolling(7).mean()
+merged_df['sentiment_SMA3'] = moving_mean(sentiment, 3)
+merged_df['sentiment_SMA7'] = moving_mean(sentiment, 7)
 
 # Price moving averages
-merged_df['SMA7'] = merged_df[close_col].rolling(7).mean()
-merged_df['SMA20'] = merged_df[close_col].rolling(20).mean()
+close = merged_df[close_col].to_numpy(dtype=np.float64)
+merged_df['SMA7'] = moving_mean(close, 7)
+merged_df['SMA20'] = moving_mean(close, 20)
 
 # RSI
-delta = merged_df[close_col].diff(1)
-gain = delta.where(delta > 0, 0)
-loss = -delta.where(delta < 0, 0)
-ema_gain = gain.ewm(com=13, adjust=False).mean()
-ema_loss = loss.ewm(com=13, adjust=False).mean()
-rs = ema_gain / ema_loss
-merged_df['RSI'] = 100 - (100 / (1 + rs))
+merged_df['RSI'] = rsi_wilder(close)
 
 # MACD
-exp1 = merged_df[close_col].ewm(span=12, adjust=False).mean()
-exp2 = merged_df[close_col].ewm(span=26, adjust=False).mean()
-merged_df['MACD'] = exp1 - exp2
-merged_df['MACD_Signal'] = merged_df['MACD'].ewm(span=9, adjust=False).mean()
+merged_df['MACD'], merged_df['MACD_Signal'] = macd_signal(close)
 
 # Target
 merged_df['Target'] = merged_df[close_col].shift(-1)
@@ -156,10 +208,9 @@ feature_cols = ['avg_sentiment', 'sentiment_lag1', 'sentiment_lag2', 'sentiment_
 
 # Add price columns
 for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-    for c in merged_df.columns:
-        if col.lower() in c.lower() and c not in feature_cols:
-            feature_cols.append(c)
-            break
+    c = find_column(col)
+    if c is not None and c not in feature_cols:
+        feature_cols.append(c)
 
 feature_cols = [c for c in feature_cols if c in merged_df.columns]
 print(f"Using {len(feature_cols)} features")
@@ -167,21 +218,44 @@ print(f"Using {len(feature_cols)} features")
 X = merged_df[feature_cols].values
 y = merged_df['Target'].values.reshape(-1, 1)
 
+def fit_min_max(values):
+    """Min-max scale columns to [0, 1] in NumPy; return the scaled data and an equivalent fitted MinMaxScaler
+
+    The scaler's fitted attributes are filled in by hand (same formulas as MinMaxScaler.fit,
+    constant columns get scale 1) so it can still be pickled and used for inverse_transform.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    data_min = values.min(axis=0)
+    data_max = values.max(axis=0)
+    data_range = data_max - data_min
+    scale = 1.0 / np.where(data_range == 0.0, 1.0, data_range)
+
+    scaler = MinMaxScaler()
+    scaler.n_features_in_ = values.shape[1]
+    scaler.n_samples_seen_ = values.shape[0]
+    scaler.data_min_ = data_min
+    scaler.data_max_ = data_max
+    scaler.data_range_ = data_range
+    scaler.scale_ = scale
+    scaler.min_ = -data_min * scale
+
+    scaled = values * scaler.scale_
+    scaled += scaler.min_
+    return scaled, scaler
+
+
 # Scale
-scaler_X = MinMaxScaler()
-scaler_y = MinMaxScaler()
-X_scaled = scaler_X.fit_transform(X)
-y_scaled = scaler_y.fit_transform(y)
+X_scaled, scaler_X = fit_min_max(X)
+y_scaled, scaler_y = fit_min_max(y)
+# Keras trains in float32: cast once here so the sequence windows below are float32 from the start
+X_scaled = X_scaled.astype(np.float32)
+y_scaled = y_scaled.astype(np.float32)
 
-# Create sequences
+# Create sequences: window i is rows [i, i+lookback), its target is row i+lookback
 lookback = 30
-X_seq, y_seq = [], []
-for i in range(len(X_scaled) - lookback):
-    X_seq.append(X_scaled[i:i+lookback])
-    y_seq.append(y_scaled[i + lookback])
-
-X_seq = np.array(X_seq)
-y_seq = np.array(y_seq)
+windows = np.lib.stride_tricks.sliding_window_view(X_scaled, lookback, axis=0)  # (N-lookback+1, F, lookback) view
+X_seq = np.ascontiguousarray(windows[:-1].transpose(0, 2, 1))
+y_seq = y_scaled[lookback:]
 print(f"Sequence shape - X: {X_seq.shape}, y: {y_seq.shape}")
 
 # Split data
@@ -206,30 +280,64 @@ import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.optimizers import Adam
+
+gpus = tf.config.list_physical_devices('GPU')
+print(f"GPUs available: {len(gpus)}")
+
+# Mixed precision only pays off on GPU tensor cores; on CPU it just adds casts
+if gpus:
+    from tensorflow.keras import mixed_precision
+    mixed_precision.set_global_policy('mixed_float16')
+    print("Using mixed_float16 precision policy")
+
+# Keep the LSTM arguments at the cuDNN-eligible settings (tanh/sigmoid, no recurrent dropout,
+# no unrolling, bias on) so on GPU each layer runs as one fused CudnnRNN kernel
+cudnn_lstm = dict(activation='tanh', recurrent_activation='sigmoid', recurrent_dropout=0.0,
+                  unroll=False, use_bias=True)
 
 model = Sequential([
     Input(shape=(X_train.shape[1], X_train.shape[2])),
-    LSTM(100, return_sequences=True),
+    LSTM(100, return_sequences=True, **cudnn_lstm),
     Dropout(0.2),
-    LSTM(100, return_sequences=False),
+    LSTM(100, return_sequences=False, **cudnn_lstm),
     Dropout(0.2),
     Dense(50, activation='relu'),
-    Dense(1)
+    Dense(1, dtype='float32')  # keep the output (and so the loss) in float32 under mixed precision
 ])
 
-model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+# Large batches amortize the per-step overhead; the learning rate is scaled linearly from
+# Adam's default 1e-3 at the original batch size of 32
+batch_size = 256
+learning_rate = 1e-3 * batch_size / 32
+
+# XLA-compile the train step on CPU to fuse the small per-timestep kernels. Not on GPU: XLA has no
+# CudnnRNN lowering, so it would trade the fused cuDNN LSTM kernel for the generic loop.
+model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse', metrics=['mae'],
+              jit_compile=not gpus)
 model.summary()
 
 # Callbacks
 early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
 reduce_lr = ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
 
+# Input pipeline: cached in memory, reshuffled every epoch like fit(shuffle=True) on arrays,
+# and prefetched so the next batch is staged while the current step runs
+train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+            .cache()
+            .shuffle(len(X_train), reshuffle_each_iteration=True)
+            .batch(batch_size, num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
+val_ds = (tf.data.Dataset.from_tensor_slices((X_val, y_val))
+          .batch(batch_size)
+          .cache()
+          .prefetch(tf.data.AUTOTUNE))
+
 print("\nTraining...")
 history = model.fit(
-    X_train, y_train,
+    train_ds,
     epochs=50,
-    batch_size=32,
-    validation_data=(X_val, y_val),
+    validation_data=val_ds,
     callbacks=[early_stop, reduce_lr],
     verbose=1
 )
@@ -241,7 +349,7 @@ print("\nSTEP 7: Evaluating...")
 
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
-y_pred_scaled = model.predict(X_test)
+y_pred_scaled = model.predict(X_test, batch_size=batch_size)
 y_pred = scaler_y.inverse_transform(y_pred_scaled)
 y_test_actual = scaler_y.inverse_transform(y_test)
 
@@ -259,10 +367,41 @@ print(f"   R²:   {r2:.4f}")
 # ============================================================
 print("\nSTEP 8: Saving model...")
 
-model_path = os.path.join(script_dir, "finbert_lstm_model.h5")
+model_path = os.path.join(script_dir, "finbert_lstm_model.keras")
 model.save(model_path)
 print(f"✅ Model saved to: {model_path}")
 
+# Inference-only SavedModel: tf.saved_model.load serves it without rebuilding the Keras model
+export_path = os.path.join(script_dir, "finbert_lstm_savedmodel")
+try:
+    model.export(export_path)
+    print(f"✅ SavedModel exported to: {export_path}")
+except (AttributeError, ValueError, OSError) as e:
+    export_path = None
+    print(f"Warning: SavedModel export skipped: {e}")
+
+# Post-training int8 quantization for CPU inference: weights and activations calibrated on
+# training windows, float input/output kept so callers feed the same scaled windows
+tflite_path = os.path.join(script_dir, "finbert_lstm_model_int8.tflite")
+
+
+def representative_windows():
+    for i in np.linspace(0, len(X_train) - 1, num=min(100, len(X_train)), dtype=int):
+        yield [X_train[i:i + 1].astype(np.float32)]
+
+
+try:
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_windows
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+    print(f"✅ int8 TFLite model saved to: {tflite_path}")
+except Exception as e:  # converter failures surface as several TF-internal error types
+    tflite_path = None
+    print(f"Warning: int8 TFLite conversion skipped: {e}")
+
 # Save scalers
 import joblib
 joblib.dump(scaler_X, os.path.join(script_dir, "scaler_X.pkl"))
@@ -278,8 +417,10 @@ print("\n" + "="*60)
 print("🎉 TRAINING COMPLETE!")
 print("="*60)
 print(f"\nOutput files:")
-print(f"  1. finbert_lstm_model.h5")
-print(f"  2. scaler_X.pkl")
-print(f"  3. scaler_y.pkl")
-print(f"  4. model_info.json")
-
+output_files = ["finbert_lstm_model.keras", "scaler_X.pkl", "scaler_y.pkl", "model_info.json"]
+if export_path:
+    output_files.append("finbert_lstm_savedmodel/")
+if tflite_path:
+    output_files.append("finbert_lstm_model_int8.tflite")
+for i, name in enumerate(output_files, 1):
+    print(f"  {i}. {name}")